@@ -0,0 +1,6 @@
+"""Benchmarks of CausalGraph and the identification methods of CausalModel.
+
+Run from the root of the repository, e.g.,
+    python -m benchmarks.run --sizes 100 1000 --output results.json
+    python -m benchmarks.compare old.json new.json
+"""
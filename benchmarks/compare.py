@@ -0,0 +1,71 @@
+"""Compare two result files of benchmarks.run, e.g., of two commits.
+
+Usage
+----------
+    python -m benchmarks.compare old.json new.json --threshold 1.2
+"""
+import argparse
+import json
+import sys
+
+
+def _key(result):
+    return (
+        result['op'], result['n'], result['degree'], result['arc_density'],
+        result['seed']
+    )
+
+
+def compare(old, new, threshold=1.2):
+    """Return the rows of the comparison of two reports.
+
+    Parameters
+    ----------
+    old : dict
+    new : dict
+    threshold : float, optional
+        Ratios of the minimal times above it are marked as regressions.
+        Defaults to 1.2.
+
+    Returns
+    ----------
+    list of tuple
+        (key, old min, new min, ratio, regression) for every case measured
+        in both reports.
+    """
+    before = {_key(r): r for r in old['results'] if r['status'] == 'ok'}
+    rows = []
+    for result in new['results']:
+        key = _key(result)
+        if result['status'] != 'ok' or key not in before:
+            continue
+        ratio = result['min'] / max(before[key]['min'], 1e-12)
+        rows.append(
+            (key, before[key]['min'], result['min'], ratio, ratio > threshold)
+        )
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    rows = compare(old, new, args.threshold)
+    for (op, n, _, arc_density, _), before, after, ratio, slower in rows:
+        print(
+            f'{op:>22} n={n:<7} arcs={arc_density:<5} {before:.6f}s -> '
+            f'{after:.6f}s x{ratio:.2f}' + (' REGRESSION' if slower else '')
+        )
+    sys.exit(1 if any(row[-1] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def random_graph(n, degree=3.0, arc_density=0.1, seed=0):
+    """Generate a random causal graph whose observed part is a DAG.
+
+    Parameters
+    ----------
+    n : int
+        Number of nodes, named V0, ..., V{n-1} in a topological order.
+    degree : float, optional
+        Expected number of parents of every node. Defaults to 3.0.
+    arc_density : float, optional
+        Expected number of latent confounding arcs per node. Defaults to 0.1.
+    seed : int, optional
+        Defaults to 0.
+
+    Returns
+    ----------
+    tuple
+        (causation, arcs) where causation maps every node to the list of its
+        parents and arcs is a list of pairs of nodes.
+    """
+    rng = np.random.default_rng(seed)
+    names = [f'V{i}' for i in range(n)]
+
+    causation = {names[0]: []} if n else {}
+    counts = np.minimum(rng.poisson(degree, n), np.arange(n))
+    for i in range(1, n):
+        parents = np.unique(rng.integers(0, i, counts[i]))
+        causation[names[i]] = [names[p] for p in parents.tolist()]
+
+    arcs = set()
+    if n > 1:
+        pairs = rng.integers(0, n, (int(round(arc_density * n)), 2))
+        for a, b in pairs.tolist():
+            if a != b:
+                arcs.add((min(a, b), max(a, b)))
+    arcs = [(names[a], names[b]) for a, b in sorted(arcs)]
+
+    return causation, arcs
+
+
+def random_query(causation, seed=0):
+    """Choose a treatment and one of its descendants as the outcome.
+
+    Parameters
+    ----------
+    causation : dict
+    seed : int, optional
+        Defaults to 0.
+
+    Returns
+    ----------
+    tuple of str
+        (treatment, outcome)
+    """
+    rng = np.random.default_rng(seed)
+    children = {node: [] for node in causation}
+    for node, parents in causation.items():
+        for parent in parents:
+            children[parent].append(node)
+
+    sources = [node for node in causation if children[node]]
+    treatment = sources[rng.integers(len(sources))]
+    outcome = children[treatment][rng.integers(len(children[treatment]))]
+    # walk a few more steps down to get a longer causal path
+    for _ in range(rng.integers(0, 3)):
+        if not children[outcome]:
+            break
+        outcome = children[outcome][rng.integers(len(children[outcome]))]
+    return treatment, outcome
@@ -0,0 +1,282 @@
+"""Time and memory-profile CausalGraph operations and the identification
+methods of CausalModel on seeded random graphs.
+
+Every operation is run repeat times on a fresh graph built outside of the
+timed region, then once more under tracemalloc to record the peak memory it
+allocates. Operations on graphs larger than their limit are recorded as
+skipped, since several identification methods are still exponential.
+
+Usage
+----------
+    python -m benchmarks.run --sizes 100 1000 --arc-density 0.1 0.5 \
+        --repeat 3 --output results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy as np
+
+from benchmarks.generate import random_graph, random_query
+from causal_model.graph import CausalGraph
+
+
+class Context:
+    """A random graph and a query shared by all operations of a case."""
+
+    def __init__(self, n, degree, arc_density, seed):
+        self.n = n
+        self.causation, self.arcs = random_graph(n, degree, arc_density, seed)
+        self.treatment, self.outcome = random_query(self.causation, seed)
+        rng = np.random.default_rng(seed)
+        self.nodes = list(self.causation)
+        self.sample = [
+            self.nodes[i] for i in rng.permutation(n)[:max(1, n // 10)]
+        ]
+        self.half = set(self.nodes[i] for i in rng.permutation(n)[:n // 2])
+        self.test_sets = [
+            {self.nodes[i] for i in rng.integers(0, n, 5)} - {
+                self.treatment, self.outcome
+            } for _ in range(100)
+        ]
+
+    def graph(self):
+        return CausalGraph(
+            self.causation, latent_confounding_arcs=self.arcs
+        )
+
+    def model(self):
+        from causal_model.model import CausalModel
+
+        return CausalModel(causal_graph=self.graph())
+
+
+def _save_load(graph):
+    with tempfile.TemporaryDirectory() as path:
+        graph.save(path)
+        CausalGraph.load(path)
+
+
+# name: (setup, run, default limit of the number of nodes)
+OPERATIONS = {
+    'construct': (lambda c: c, lambda c: c.graph(), None),
+    'copy': (Context.graph, lambda g: g.copy(), None),
+    'compact': (Context.graph, lambda g: g.compact(), None),
+    'to_csr': (Context.graph, lambda g: g.to_csr(), None),
+    'dag': (Context.graph, lambda g: g.dag, None),
+    'topo_order': (Context.graph, lambda g: list(g.topo_order), None),
+    'c_components': (Context.graph, lambda g: list(g.c_components), None),
+    'ancestors': (
+        lambda c: (c.graph(), c.outcome),
+        lambda s: s[0].ancestors({s[1]}), None
+    ),
+    'descendants': (
+        lambda c: (c.graph(), c.treatment),
+        lambda s: s[0].descendants({s[1]}), None
+    ),
+    'reachability_index': (Context.graph, lambda g: g.reachability, 20000),
+    'is_d_separated': (
+        lambda c: (c.graph(), c),
+        lambda s: s[0].is_d_separated(
+            {s[1].treatment}, {s[1].outcome},
+            set(s[0].causation[s[1].treatment]),
+            cut_outgoing={s[1].treatment}
+        ), None
+    ),
+    'is_d_separated_many': (
+        lambda c: (c.graph(), c),
+        lambda s: s[0].is_d_separated_many(
+            {s[1].treatment}, {s[1].outcome}, s[1].test_sets,
+            cut_outgoing={s[1].treatment}
+        ), None
+    ),
+    'remove_nodes': (
+        lambda c: (c.graph(), c.sample),
+        lambda s: s[0].remove_nodes(s[1], new=True), None
+    ),
+    'build_sub_graph': (
+        lambda c: (c.graph(), c.half),
+        lambda s: s[0].build_sub_graph(s[1]), None
+    ),
+    'build_sub_graph_view': (
+        lambda c: (c.graph(), c.half),
+        lambda s: s[0].build_sub_graph(s[1], view=True), None
+    ),
+    'to_adj_matrix_sparse': (
+        Context.graph, lambda g: g.to_adj_matrix(sparse=True), None
+    ),
+    'save_load': (Context.graph, _save_load, None),
+    'id': (
+        lambda c: (c.model(), c),
+        lambda s: s[0].id({s[1].outcome}, {s[1].treatment}), 10000
+    ),
+}
+for _style, _limit in (('simple', None), ('minimal', None),
+                       ('minimum', None), ('all', 20)):
+    OPERATIONS[f'backdoor_{_style}'] = (
+        lambda c: (c.model(), c),
+        lambda s, style=_style: s[0].get_backdoor_set(
+            s[1].treatment, s[1].outcome, adjust=style
+        ), _limit
+    )
+OPERATIONS['backdoor_first'] = (
+    lambda c: (c.model(), c),
+    lambda s: next(
+        s[0].iter_backdoor_sets(s[1].treatment, s[1].outcome), None
+    ), None
+)
+for _style, _limit in (('simple', None), ('minimal', None), ('all', 20)):
+    OPERATIONS[f'frontdoor_{_style}'] = (
+        lambda c: (c.model(), c),
+        lambda s, style=_style: s[0].get_frontdoor_set(
+            s[1].treatment, s[1].outcome, adjust=style
+        ), _limit
+    )
+OPERATIONS['frontdoor_first'] = (
+    lambda c: (c.model(), c),
+    lambda s: next(
+        s[0].iter_frontdoor_sets(s[1].treatment, s[1].outcome), None
+    ), None
+)
+
+
+def measure(context, setup, run, repeat):
+    """Return the timings and the peak traced memory of an operation.
+
+    Returns
+    ----------
+    dict
+    """
+    times = []
+    for _ in range(repeat):
+        state = setup(context)
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    state = setup(context)
+    tracemalloc.start()
+    try:
+        run(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'peak_bytes': peak,
+    }
+
+
+def _metadata(args):
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'networkx': nx.__version__,
+        'platform': platform.platform(),
+        'args': vars(args),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+        help='numbers of nodes of the random graphs'
+    )
+    parser.add_argument(
+        '--degree', type=float, default=3.0,
+        help='expected number of parents of every node'
+    )
+    parser.add_argument(
+        '--arc-density', type=float, nargs='+', default=[0.1],
+        help='expected numbers of latent confounding arcs per node'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--ops', nargs='+', choices=sorted(OPERATIONS), default=None,
+        help='operations to run, all by default'
+    )
+    parser.add_argument(
+        '--limit', nargs='+', default=[], metavar='OP=N',
+        help='override the maximal number of nodes of an operation, where '
+             'N <= 0 removes the limit'
+    )
+    parser.add_argument(
+        '--output', default=None, help='JSON file of the results, or stdout'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    limits = {name: op[2] for name, op in OPERATIONS.items()}
+    for item in args.limit:
+        name, value = item.split('=')
+        limits[name] = int(value) if int(value) > 0 else None
+
+    from causal_model.model import IdentificationError
+
+    results = []
+    for n in args.sizes:
+        for arc_density in args.arc_density:
+            context = Context(n, args.degree, arc_density, args.seed)
+            for name in args.ops or OPERATIONS:
+                setup, run, _ = OPERATIONS[name]
+                result = {
+                    'op': name, 'n': n, 'degree': args.degree,
+                    'arc_density': arc_density, 'seed': args.seed,
+                }
+                if limits[name] is not None and n > limits[name]:
+                    result['status'] = 'skipped'
+                else:
+                    try:
+                        # keep stdout for the report
+                        with contextlib.redirect_stdout(sys.stderr):
+                            result.update(
+                                measure(context, setup, run, args.repeat)
+                            )
+                        result['status'] = 'ok'
+                    except IdentificationError as e:
+                        result['status'] = 'raised'
+                        result['message'] = str(e)
+                results.append(result)
+                print(
+                    f"{name:>22} n={n:<7} arcs={arc_density:<5} "
+                    f"{result['status']:>7} "
+                    f"{result.get('min', float('nan')):.6f}s",
+                    file=sys.stderr
+                )
+
+    report = {'meta': _metadata(args), 'results': results}
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=1)
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
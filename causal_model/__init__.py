@@ -1,5 +1,13 @@
+from . import adjustment
+from . import cache
 from . import graph
+from . import graph_core
+from . import graph_io
 from . import model
+from . import ordering
+from . import paths
 from . import prob
+from . import reachability
 from . import scm
+from . import separation
 #from . import identification
@@ -0,0 +1,606 @@
+import heapq
+import itertools
+import networkx as nx
+
+
+def _partition(include, candidates, z):
+    """Generate the parts of the sets between include and candidates other
+    than z, where every other set differs from z on a first free node
+    (Lawler, 1972).
+    """
+    for node in sorted(candidates - include):
+        if node in z:
+            yield include, candidates - {node}
+            include = include | {node}
+        else:
+            yield include | {node}, candidates
+            candidates = candidates - {node}
+
+
+class SeparatorSearch:
+    """
+    Constructive search of sets d-separating x and y in polynomial time,
+    following van der Zander, Liśkiewicz and Textor (2019), Separators and
+    adjustment sets in causal graphs: complete criteria and an algorithmic
+    framework (https://arxiv.org/abs/1803.00116).
+
+    Every search is restricted to the ancestral set A of x, y and the nodes
+    that must be included. A set z of nodes in A d-separates x and y if and
+    only if removing z separates them in the moral graph of A, where two
+    nodes are adjacent if they are joined by an edge or by a path whose
+    inner nodes are all colliders, i.e., each district (C-component) of A is
+    joined with its parents. The moral graph is built with one auxiliary
+    node per district adjacent to the district and its parents, which
+    stands for the unobserved parents of latent confounding arcs and keeps
+    the moral graph of size O(V + E).
+
+    Attributes
+    ----------
+    engine : DSeparation
+        The d-separation engine of the graph, whose integer-indexed
+        adjacency lists are shared.
+
+    Methods
+    ----------
+    find(x, y, include=None, restrict=None, cut_outgoing=None)
+        Return a set d-separating x and y, or None.
+    find_minimal(x, y, include=None, restrict=None, cut_outgoing=None)
+        Return a minimal set d-separating x and y, or None.
+    find_minimum(x, y, include=None, restrict=None, cut_outgoing=None,
+                 cost=None)
+        Return a d-separating set of minimum cost, or None.
+    iter_separators(x, y, include=None, restrict=None, cut_outgoing=None,
+                    cost=None)
+        Generate all d-separating sets with polynomial delay.
+    """
+
+    def __init__(self, engine):
+        """
+        Parameters
+        ----------
+        engine : DSeparation
+        """
+        self.engine = engine
+
+    def _query(self, x, y, include, restrict, cut_outgoing):
+        """Return the query on integer indices, where the candidates are the
+        nodes of restrict, excluding x and y, and include must be a subset
+        of them.
+        """
+        engine = self.engine
+        x, y = set(engine._indices(x)), set(engine._indices(y))
+        include = set(engine._indices(include or ()))
+        if restrict is None:
+            candidates = set(range(len(engine.names)))
+        else:
+            candidates = set(engine._indices(restrict))
+        candidates -= x | y
+        if not include <= candidates:
+            raise ValueError(
+                'The nodes to include must be in restrict and not in x or y.'
+            )
+        cut = frozenset(engine._indices(cut_outgoing or ()))
+        return x, y, include, candidates, cut
+
+    def _moral_graph(self, ancestral, cut):
+        """Return the adjacency lists of the moral graph of the nodes flagged
+        in ancestral. Nodes keep their indices and the auxiliary node of the
+        k-th district is numbered n + k.
+        """
+        engine = self.engine
+        n = len(engine.names)
+        district = {}
+        adj = {}
+        for node in range(n):
+            if not ancestral[node] or node in district:
+                continue
+            aux = n + len(adj)
+            members = []
+            stack = [node]
+            district[node] = aux
+            while stack:
+                member = stack.pop()
+                members.append(member)
+                for w in engine.spouses[member]:
+                    if ancestral[w] and w not in district:
+                        district[w] = aux
+                        stack.append(w)
+            neighbours = set(members)
+            for member in members:
+                neighbours.update(
+                    p for p in engine.parents[member] if p not in cut
+                )
+            adj[aux] = list(neighbours)
+
+        for aux, neighbours in list(adj.items()):
+            for node in neighbours:
+                adj.setdefault(node, []).append(aux)
+        return adj
+
+    def _reach(self, adj, start, blocked):
+        """Return the nodes reachable from start in adj, where nodes flagged
+        in blocked are reached but not passed through.
+        """
+        reached = set(start)
+        stack = list(start)
+        while stack:
+            node = stack.pop()
+            if node in blocked and node not in start:
+                continue
+            for w in adj.get(node, ()):
+                if w not in reached:
+                    reached.add(w)
+                    stack.append(w)
+        return reached
+
+    def _find(self, x, y, include, candidates, cut):
+        ancestral = self.engine._ancestor_flags(list(x | y | include), cut)
+        z = {node for node in candidates if ancestral[node]}
+        if self.engine._test(list(x), list(y), list(z), cut):
+            return z, ancestral
+        return None, ancestral
+
+    def _names(self, nodes):
+        return {self.engine.names[node] for node in nodes}
+
+    def find(self, x, y, include=None, restrict=None, cut_outgoing=None):
+        """Return a set z with include ⊆ z ⊆ restrict d-separating x and y,
+        or None if there is no such set. The set contains all candidates in
+        the ancestors of x, y and include, and takes O(V + E) to find.
+
+        Parameters
+        ----------
+        x : set of str
+        y : set of str
+        include : set of str, optional
+            Nodes that must be in the set. Defaults to None.
+        restrict : set of str, optional
+            Nodes that may be in the set, all nodes other than x and y by
+            default.
+        cut_outgoing : set of str, optional
+            See DSeparation.is_d_separated(). Defaults to None.
+
+        Returns
+        ----------
+        set of str or None
+        """
+        query = self._query(x, y, include, restrict, cut_outgoing)
+        z, _ = self._find(*query)
+        return None if z is None else self._names(z)
+
+    def find_minimal(self, x, y, include=None, restrict=None,
+                     cut_outgoing=None):
+        """Return a set z with include ⊆ z ⊆ restrict d-separating x and y
+        such that no proper subset of z containing include d-separates them,
+        or None if there is no such set. Takes O(V + E).
+
+        Parameters
+        ----------
+        See find().
+
+        Returns
+        ----------
+        set of str or None
+        """
+        query = self._query(x, y, include, restrict, cut_outgoing)
+        z = self._minimal(*query)
+        return None if z is None else self._names(z)
+
+    def _minimal(self, x, y, include, candidates, cut):
+        z, ancestral = self._find(x, y, include, candidates, cut)
+        if z is None or not x or not y:
+            return None if z is None else include
+
+        # nodes of include are conditioned on, so they are removed from the
+        # moral graph, then z is shrunk to the nodes adjacent to components
+        # of x and of y
+        adj = self._moral_graph(ancestral, cut)
+        for node in include:
+            for w in adj.pop(node, ()):
+                adj[w] = [v for v in adj[w] if v != node]
+        blocked = z - include
+        blocked &= self._reach(adj, x, blocked)
+        blocked &= self._reach(adj, y, blocked)
+        return blocked | include
+
+    def find_minimum(self, x, y, include=None, restrict=None,
+                     cut_outgoing=None, cost=None):
+        """Return a set z with include ⊆ z ⊆ restrict d-separating x and y
+        whose total cost is minimum, or None if there is no such set. The
+        set is a minimum vertex cut between x and y in the moral graph of
+        their ancestors, found with a maximum flow.
+
+        Parameters
+        ----------
+        x : set of str
+        y : set of str
+        include : set of str, optional
+        restrict : set of str, optional
+        cut_outgoing : set of str, optional
+            See find().
+        cost : dict or callable, optional
+            Positive cost of every node, given by a map from names of nodes,
+            where missing nodes cost 1, or by a function of the name. The
+            cost of include is not counted. Defaults to None, i.e., a set
+            of minimum size.
+
+        Returns
+        ----------
+        set of str or None
+        """
+        query = self._query(x, y, include, restrict, cut_outgoing)
+        z = self._minimum(*query, self._weight(cost))
+        return None if z is None else self._names(z)
+
+    def _weight(self, cost):
+        names = self.engine.names
+        if cost is None:
+            def weight(node):
+                return 1
+        elif callable(cost):
+            def weight(node):
+                return cost(names[node])
+        else:
+            def weight(node):
+                return cost.get(names[node], 1)
+        return weight
+
+    def _minimum(self, x, y, include, candidates, cut, weight):
+        z, ancestral = self._find(x, y, include, candidates, cut)
+        if z is None or not x or not y:
+            return None if z is None else include
+
+        # split every node v into (v, 0) -> (v, 1), where only the edges of
+        # candidates have finite capacities
+        adj = self._moral_graph(ancestral, cut)
+        flow = nx.DiGraph()
+        for node, neighbours in adj.items():
+            if node in include:
+                continue
+            if node in z:
+                flow.add_edge((node, 0), (node, 1), capacity=weight(node))
+            else:
+                flow.add_edge((node, 0), (node, 1))
+            flow.add_edges_from(
+                ((node, 1), (w, 0)) for w in neighbours if w not in include
+            )
+        flow.add_edges_from(('source', (node, 0)) for node in x)
+        flow.add_edges_from(((node, 1), 'sink') for node in y)
+
+        _, (reachable, _) = nx.minimum_cut(flow, 'source', 'sink')
+        separator = {
+            node for node in z - include
+            if (node, 0) in reachable and (node, 1) not in reachable
+        }
+        return separator | include
+
+    def iter_separators(self, x, y, include=None, restrict=None,
+                        cut_outgoing=None, cost=None):
+        """Generate every set z with include ⊆ z ⊆ restrict d-separating x
+        and y with polynomial delay.
+
+        After every output, the remaining sets are partitioned into at most
+        n parts, each fixing more candidates in or out of the set (Lawler,
+        1972). Without cost, parts are searched depth first with
+        find_minimal(), which prunes a part without any separator in
+        O(V + E), so the first output is a minimal set found in O(V + E)
+        and at most O(n^2) searches separate two outputs, where n is the
+        number of candidates. With cost, every part is solved with
+        find_minimum() and the sets are listed in the order of their total
+        costs, with O(n) maximum flows between two outputs.
+
+        Parameters
+        ----------
+        x : set of str
+        y : set of str
+        include : set of str, optional
+        restrict : set of str, optional
+        cut_outgoing : set of str, optional
+            See find().
+        cost : dict or callable, optional
+            Positive cost of every node, see find_minimum(). Defaults to
+            None, i.e., sets are not ordered.
+
+        Returns
+        ----------
+        generator of set of str
+        """
+        x, y, include, candidates, cut = self._query(
+            x, y, include, restrict, cut_outgoing
+        )
+        if cost is not None:
+            yield from self._iter_ranked(
+                x, y, include, candidates, cut, self._weight(cost)
+            )
+            return
+
+        z = self._minimal(x, y, include, candidates, cut)
+        stack = []
+        while z is not None:
+            yield self._names(z)
+            stack.append(_partition(include, candidates, z))
+            z = None
+            while z is None and stack:
+                part = next(stack[-1], None)
+                if part is None:
+                    stack.pop()
+                    continue
+                include, candidates = part
+                z = self._minimal(x, y, include, candidates, cut)
+
+    def _iter_ranked(self, x, y, include, candidates, cut, weight):
+        heap = []
+        count = itertools.count()
+
+        def push(include, candidates):
+            z = self._minimum(x, y, include, candidates, cut, weight)
+            if z is not None:
+                heapq.heappush(heap, (
+                    sum(weight(node) for node in z), next(count), z,
+                    include, candidates
+                ))
+
+        push(include, candidates)
+        while heap:
+            _, _, z, include, candidates = heapq.heappop(heap)
+            yield self._names(z)
+            for part in _partition(include, candidates, z):
+                push(*part)
+
+
+class FrontdoorSearch:
+    """
+    Polynomial-time search of frontdoor adjustment sets, following Jeong,
+    Tian and Bareinboim (2022), Finding and listing front-door adjustment
+    sets (https://arxiv.org/abs/2210.05816).
+
+    A set z satisfies the frontdoor criterion for the causal effect of x on
+    y if
+        1. z intercepts all directed paths from x to y,
+        2. no backdoor path from x to z is open given the empty set, and
+        3. x blocks all backdoor paths from z to y, i.e., x d-separates z
+           and y in the graph without outgoing edges of z.
+    Condition 2 holds for every node separately and is tested for all
+    candidates with a single traversal. Given condition 2, no node of z is
+    an ancestor of x, so a path open given x from a node of z to y never
+    passes through other nodes of z, and the union of two sets satisfying
+    condition 3 satisfies it as well. The largest such set among the
+    candidates is found by dropping the nodes violating condition 3 until
+    none is left, and a frontdoor set exists if and only if it satisfies
+    condition 1, since every valid set is contained in it.
+
+    Attributes
+    ----------
+    engine : DSeparation
+        The d-separation engine of the graph, whose integer-indexed
+        adjacency lists are shared.
+
+    Methods
+    ----------
+    is_frontdoor_set(z, x, y)
+        Check if z satisfies the frontdoor criterion.
+    find(x, y, include=None, restrict=None)
+        Return the largest frontdoor set, or None.
+    find_minimal(x, y, include=None, restrict=None)
+        Return a minimal frontdoor set, or None.
+    iter_sets(x, y, include=None, restrict=None)
+        Generate all frontdoor sets with polynomial delay.
+    """
+
+    def __init__(self, engine):
+        """
+        Parameters
+        ----------
+        engine : DSeparation
+        """
+        self.engine = engine
+
+    def _intercepts(self, x, y, z):
+        """Check if z intercepts all directed paths from x to y."""
+        children = self.engine.children
+        reached = set(x)
+        stack = list(x)
+        while stack:
+            for w in children[stack.pop()]:
+                if w in y:
+                    return False
+                if w not in reached and w not in z:
+                    reached.add(w)
+                    stack.append(w)
+        return True
+
+    def _violations(self, y, z, conditioned, an_x):
+        """Return the nodes of z with a backdoor path to y open given the
+        conditioned nodes, whose inner nodes are not in z.
+        """
+        engine = self.engine
+        parents, children, spouses = (
+            engine.parents, engine.children, engine.spouses
+        )
+        n = len(engine.names)
+        visited_up, visited_down = bytearray(n), bytearray(n)
+        violations = set()
+        # the ball starts from y, so arriving at a node of z from one of its
+        # parents means that the path ends with an edge into the node
+        up, down = list(y), []
+        while up or down:
+            if up:
+                node = up.pop()
+                if visited_up[node]:
+                    continue
+                visited_up[node] = 1
+                if node in z or conditioned[node]:
+                    continue
+                up.extend(parents[node])
+                down.extend(children[node])
+                down.extend(spouses[node])
+            else:
+                node = down.pop()
+                if visited_down[node]:
+                    continue
+                visited_down[node] = 1
+                if node in z:
+                    violations.add(node)
+                    continue
+                if not conditioned[node]:
+                    down.extend(children[node])
+                if an_x[node]:
+                    up.extend(parents[node])
+                    down.extend(spouses[node])
+        return violations
+
+    def _query(self, x, y, include, restrict):
+        """Return the query on integer indices with the candidates
+        satisfying condition 2, which are by default the nodes on directed
+        paths from x to y.
+        """
+        engine = self.engine
+        x, y = set(engine._indices(x)), set(engine._indices(y))
+        include = set(engine._indices(include or ()))
+        if restrict is None:
+            descendants = set(x)
+            stack = list(x)
+            while stack:
+                for w in engine.children[stack.pop()]:
+                    if w not in descendants:
+                        descendants.add(w)
+                        stack.append(w)
+            an_y = engine._ancestor_flags(list(y), frozenset())
+            candidates = {node for node in descendants if an_y[node]}
+        else:
+            candidates = set(engine._indices(restrict))
+        candidates -= x | y
+        if not include <= candidates:
+            raise ValueError(
+                'The nodes to include must be in restrict and not in x or y.'
+            )
+
+        connected = engine._reachable(list(x), [], frozenset(x))
+        candidates = {node for node in candidates if not connected[node]}
+        conditioned = bytearray(len(engine.names))
+        for node in x:
+            conditioned[node] = 1
+        an_x = engine._ancestor_flags(list(x), frozenset())
+        return x, y, include, candidates, (conditioned, an_x)
+
+    def _find(self, x, y, include, candidates, state):
+        z = set(candidates)
+        violations = self._violations(y, z, *state)
+        while violations:
+            z -= violations
+            violations = self._violations(y, z, *state)
+        if not include <= z or not self._intercepts(x, y, z):
+            return None
+        return z
+
+    def _minimal(self, x, y, include, candidates, state):
+        z = self._find(x, y, include, candidates, state)
+        if z is None:
+            return None
+        # no frontdoor set between include and z without node means that
+        # node is in all frontdoor sets contained in z
+        for node in sorted(z - include):
+            if node in z:
+                smaller = self._find(x, y, include, z - {node}, state)
+                if smaller is not None:
+                    z = smaller
+        return z
+
+    def _names(self, nodes):
+        return {self.engine.names[node] for node in nodes}
+
+    def is_frontdoor_set(self, z, x, y):
+        """Check if z satisfies the frontdoor criterion for the causal effect
+        of x on y. Takes O(V + E).
+
+        Parameters
+        ----------
+        z : set of str
+        x : set of str
+        y : set of str
+
+        Returns
+        ----------
+        bool
+        """
+        engine = self.engine
+        z = set(engine._indices(z))
+        x, y = engine._indices(x), engine._indices(y)
+        if not self._intercepts(x, set(y), z):
+            return False
+        connected = engine._reachable(x, [], frozenset(x))
+        if any(connected[node] for node in z):
+            return False
+        return engine._test(list(z), y, x, frozenset(z))
+
+    def find(self, x, y, include=None, restrict=None):
+        """Return the largest set z with include ⊆ z ⊆ restrict satisfying
+        the frontdoor criterion, or None if there is no such set. Takes
+        O(n(V + E)) for n candidates.
+
+        Parameters
+        ----------
+        x : set of str
+        y : set of str
+        include : set of str, optional
+            Nodes that must be in the set. Defaults to None.
+        restrict : set of str, optional
+            Nodes that may be in the set, the nodes on directed paths from x
+            to y by default.
+
+        Returns
+        ----------
+        set of str or None
+        """
+        z = self._find(*self._query(x, y, include, restrict))
+        return None if z is None else self._names(z)
+
+    def find_minimal(self, x, y, include=None, restrict=None):
+        """Return a set z with include ⊆ z ⊆ restrict satisfying the
+        frontdoor criterion such that no proper subset of z containing
+        include satisfies it, or None if there is no such set. Each node of
+        the largest frontdoor set is dropped if a frontdoor set remains
+        without it, which takes O(n^2(V + E)).
+
+        Parameters
+        ----------
+        See find().
+
+        Returns
+        ----------
+        set of str or None
+        """
+        z = self._minimal(*self._query(x, y, include, restrict))
+        return None if z is None else self._names(z)
+
+    def iter_sets(self, x, y, include=None, restrict=None):
+        """Generate every set z with include ⊆ z ⊆ restrict satisfying the
+        frontdoor criterion with polynomial delay. As in
+        SeparatorSearch.iter_separators(), the remaining sets are
+        partitioned after every output and the parts are searched depth
+        first, where find() prunes a part without any frontdoor set.
+
+        Parameters
+        ----------
+        See find().
+
+        Returns
+        ----------
+        generator of set of str
+        """
+        x, y, include, candidates, state = self._query(
+            x, y, include, restrict
+        )
+        z = self._find(x, y, include, candidates, state)
+        stack = []
+        while z is not None:
+            yield self._names(z)
+            stack.append(_partition(include, candidates, z))
+            z = None
+            while z is None and stack:
+                part = next(stack[-1], None)
+                if part is None:
+                    stack.pop()
+                    continue
+                include, candidates = part
+                z = self._find(x, y, include, candidates, state)
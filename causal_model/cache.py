@@ -0,0 +1,183 @@
+import json
+import os
+import sqlite3
+import time
+
+from causal_model.prob import Prob
+
+
+def encode(value):
+    """Return a JSON-serializable form of an identification result, which
+    may contain Prob, sets, tuples, lists and str.
+    """
+    if isinstance(value, Prob):
+        return {'prob': value.to_dict()}
+    if isinstance(value, (set, frozenset)):
+        return {'set': sorted((encode(v) for v in value), key=repr)}
+    if isinstance(value, tuple):
+        return {'tuple': [encode(v) for v in value]}
+    if isinstance(value, list):
+        return [encode(v) for v in value]
+    return value
+
+
+def decode(value):
+    """Inverse of encode()."""
+    if isinstance(value, dict):
+        if 'prob' in value:
+            return Prob.from_dict(value['prob'])
+        if 'set' in value:
+            return set(decode(v) for v in value['set'])
+        return tuple(decode(v) for v in value['tuple'])
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    return value
+
+
+class IdentificationCache:
+    """
+    Persistent cache of identification results stored in a SQLite database,
+    which can be shared by processes and survives restarts.
+
+    Results are keyed by the fingerprint of the causal graph, the
+    identification method, the treatment, the outcome and the style of the
+    returned set, and stored as JSON with the time of their last use. When
+    the number of results exceeds max_entries, the least recently used ones
+    are evicted.
+
+    Attributes
+    ----------
+    path : str
+        Path of the database file.
+    max_entries : int
+        Maximal number of stored results.
+
+    Methods
+    ----------
+    make_key(fingerprint, method, treatment, outcome, style=None)
+        Return the key of an identification query.
+    get(key)
+        Return the stored result of key, or None.
+    put(key, result)
+        Store the result of key.
+    clear()
+        Remove all results.
+    """
+
+    def __init__(self, path, max_entries=100000):
+        """
+        Parameters
+        ----------
+        path : str
+            Path of the database file, created if it does not exist.
+        max_entries : int, optional
+            Defaults to 100000.
+        """
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self._connection = None
+        self._pid = None
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'used REAL NOT NULL)'
+            )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS results_used ON results (used)'
+            )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        return state
+
+    def _connect(self):
+        # connections can not be shared with forked processes
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def make_key(fingerprint, method, treatment, outcome, style=None):
+        """Return the key of an identification query.
+
+        Parameters
+        ----------
+        fingerprint : int
+            The fingerprint of the causal graph.
+        method : str
+            E.g., id, backdoor or frontdoor.
+        treatment : set of str
+        outcome : set of str
+        style : str, optional
+            The style of the returned set. Defaults to None.
+
+        Returns
+        ----------
+        str
+        """
+        return json.dumps([
+            fingerprint, method, sorted(treatment, key=str),
+            sorted(outcome, key=str), style
+        ])
+
+    def get(self, key):
+        """Return the stored result of key and mark it as recently used.
+
+        Parameters
+        ----------
+        key : str
+            See make_key().
+
+        Returns
+        ----------
+        dict or None
+            None if the key is not stored.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                'SELECT value FROM results WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                'UPDATE results SET used = ? WHERE key = ?',
+                (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        """Store the result of key and evict the least recently used results
+        beyond max_entries.
+
+        Parameters
+        ----------
+        key : str
+            See make_key().
+        result : dict
+            JSON-serializable result.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO results (key, value, used) '
+                'VALUES (?, ?, ?)', (key, json.dumps(result), time.time())
+            )
+            connection.execute(
+                'DELETE FROM results WHERE key IN (SELECT key FROM results '
+                'ORDER BY used DESC LIMIT -1 OFFSET ?)', (self.max_entries,)
+            )
+
+    def clear(self):
+        """Remove all results."""
+        with self._connect() as connection:
+            connection.execute('DELETE FROM results')
+
+    def __len__(self):
+        with self._connect() as connection:
+            return connection.execute(
+                'SELECT COUNT(*) FROM results'
+            ).fetchone()[0]
@@ -1,24 +1,53 @@
 import networkx as nx
 import numpy as np
 
-from copy import deepcopy
-from collections import defaultdict
+from collections import deque
+from causal_model import graph_io
 from causal_model import prob
+from causal_model.adjustment import FrontdoorSearch, SeparatorSearch
+from causal_model.graph_core import (
+    FINGERPRINT_MASK, CowMap, CausationView, CsrGraph, MaskedMap, UnionFind,
+    element_hash
+)
+from causal_model.ordering import CycleError, TopologicalOrder
+from causal_model.paths import PathAnalysis
+from causal_model.reachability import ReachabilityIndex
+from causal_model.separation import DSeparation
 
 
 class CausalGraph:
     """
     Class for building a causal graphical model.
 
+    The structure of the graph is kept in copy-on-write maps, so that graphs
+    derived with new=True or copy() share all unchanged parts with the graph
+    they come from and only store their own modifications. Calling compact()
+    moves the structure into integer-indexed CSR arrays (see CsrGraph), which
+    is much smaller for large graphs, while later modifications are stored
+    on top of these arrays.
+
     Attributes
     ----------
-    causation : dict
-        Data structure of the causal graph where values are parents of the
-        corresponding keys.
+    causation : CausationView
+        Read-only mapping of the causal graph where values are lists of the
+        parents of the corresponding keys.
     dag : nx.MultiDiGraph
-        Graph represented by the networkx package.
+        Graph represented by the networkx package. Observed edges have the key
+        0 while every unobserved bidirected confounding arc is stored as two
+        edges with the key 'n'. It is built from the structure of the graph on
+        demand and frozen.
+    version : int
+        Counter of structural modifications. Derived views of the graph are
+        cached until the next modification.
+    reachability_index : bool
+        If True, ancestors() and descendants() are answered by the
+        precomputed ReachabilityIndex of the graph, which is rebuilt lazily
+        after modifications. Not inherited by copies. Defaults to False.
+    reachability
+    d_separation
     prob
     latent_confounding_arcs
+    fingerprint
     is_dag
     c_components
     observed_dag
@@ -27,12 +56,43 @@ class CausalGraph:
 
     Methods
     ----------
-    to_adj_matrix()
-        Return the numpy matrix of the adjecency matrix.
+    copy()
+        Return a new CausalGraph sharing its structure with the graph.
+    compact()
+        Store the structure of the graph in integer-indexed CSR arrays.
+    from_csr(csr)
+        Return a compact CausalGraph with the structure of a CsrGraph.
+    from_edge_files(edges, arcs=None, chunksize=100000)
+        Build a compact CausalGraph from files of edges.
+    save(path)
+        Save the structure of the graph as a binary snapshot.
+    load(path, mmap=True)
+        Load a CausalGraph from a snapshot.
+    to_csr()
+        Return the integer-indexed CsrGraph of the structure of the graph.
+    to_adj_matrix(sparse=False)
+        Return the numpy matrix of the adjecency matrix, or scipy.sparse
+        matrices of its directed and bidirected parts if sparse.
     to_adj_list()
-        Return the numpy array of the adjecency matrix.
+        Return the numpy arrays of the indices of the children of every node.
+    is_d_separated(x, y, test_set, cut_outgoing=None)
+        Check if test_set d-separates x and y.
+    is_d_separated_many(x, y, test_sets, cut_outgoing=None, n_jobs=None)
+        Check if each set in test_sets d-separates x and y.
+    is_d_separated_batch(queries, cut_outgoing=None, n_jobs=None)
+        Check if z d-separates x and y for every (x, y, z) in queries.
     ancestors(y)
         Return ancestors of y.
+    descendants(x)
+        Return descendants of x.
+    c_component_of(node)
+        Return the C-component containing node.
+    maintain_topo_order(maintain=True)
+        Maintain a topological order and reject edges closing cycles.
+    ancestors_many(sets)
+        Return ancestors of every set of nodes in sets.
+    descendants_many(sets)
+        Return descendants of every set of nodes in sets.
     add_nodes(nodes, new=False)
         If not new, add all nodes in the nodes to the current
         CausalGraph, else create a new graph and add nodes.
@@ -48,7 +108,7 @@ class CausalGraph:
         latent confounding arcs.
     remove_edges_from(edge_list, new=False, observed=True)
         Remove all edges in the edge_list in the CausalGraph.
-    build_sub_graph(subset)
+    build_sub_graph(subset, view=False)
         Return a new CausalGraph as the subgraph of self with nodes in the
         subset.
     remove_incoming_edges(y, new=False)
@@ -71,18 +131,336 @@ class CausalGraph:
             Unobserved bidirected edges. Defaults to None. Each element is a
             tuple containing 2 elements.
         """
-        # TODO: replace list or tuple with generator to save memory
+        self.version = 0
+        self.reachability_index = False
+        self._cache = {}
+
+        # parents and children of every node, and the index of the
+        # unobserved bidirected confounding arcs mapping each node to the set
+        # of nodes it shares a latent confounder with
+        self._parents = CowMap(dict.fromkeys)
+        self._children = CowMap(dict.fromkeys)
+        self._arcs = CowMap(set)
+        # C-components are maintained incrementally while arcs are added and
+        # rebuilt lazily after arcs are removed, where None marks a stale
+        # structure
+        self._c_components = UnionFind()
+        # incrementally maintained topological order, see
+        # maintain_topo_order()
+        self._topo = None
+        # computed on first access and then maintained by the primitives
+        self._fingerprint = None
+
+        for node, parents in causation.items():
+            self._add_node(node)
+            for parent in parents:
+                self._add_edge(parent, node)
 
-        self.causation = defaultdict(list, causation)
-        self.dag = self.observed_dag.copy() if dag is None else dag
+        if dag is not None:
+            for node in dag.nodes:
+                self._add_node(node)
+            for s, t, key in dag.edges(keys=True):
+                if key == 'n':
+                    self._add_arcs([(s, t)])
+                else:
+                    self._add_edge(s, t)
 
-        # add unobserved bidirected confounding arcs to the graph, with the
-        # letter 'n' representing that the edge is unobserved
         if latent_confounding_arcs is not None:
-            for edge in latent_confounding_arcs:
-                self.dag.add_edges_from(
-                    [(edge[0], edge[1], 'n'), (edge[1], edge[0], 'n')]
-                )
+            self._add_arcs(latent_confounding_arcs)
+
+    def copy(self):
+        """Return a new CausalGraph with the same structure. The new graph
+        shares its structure with the original one until either of them is
+        modified, so copying costs O(1).
+
+        Returns
+        ----------
+        CausalGraph
+        """
+        graph = CausalGraph.__new__(CausalGraph)
+        graph.version = 0
+        graph.reachability_index = False
+        graph._cache = dict(self._cache)
+        graph._parents = self._parents.fork()
+        graph._children = self._children.fork()
+        graph._arcs = self._arcs.fork()
+        graph._c_components = None if self._c_components is None \
+            else self._c_components.fork()
+        graph._topo = None if self._topo is None else self._topo.fork()
+        graph._fingerprint = self._fingerprint
+        return graph
+
+    def compact(self):
+        """Store the structure of the graph in integer-indexed CSR arrays
+        instead of dicts of nodes. All methods keep working on the compact
+        graph, and later modifications are stored in dicts on top of the
+        arrays until compact() is called again.
+        """
+        self._load_csr(self.to_csr())
+
+    def _load_csr(self, csr):
+        arcs = csr.layer('arcs')
+        self._parents = CowMap(dict.fromkeys, csr.layer('parents'), len(csr))
+        self._children = CowMap(
+            dict.fromkeys, csr.layer('children'), len(csr)
+        )
+        self._arcs = CowMap(set, arcs, len(arcs))
+
+    @classmethod
+    def from_csr(cls, csr):
+        """Return a compact CausalGraph with the structure of csr.
+
+        Parameters
+        ----------
+        csr : CsrGraph
+
+        Returns
+        ----------
+        CausalGraph
+        """
+        graph = cls.__new__(cls)
+        graph.version = 0
+        graph.reachability_index = False
+        graph._cache = {'csr': csr}
+        graph._c_components = None
+        graph._topo = None
+        graph._fingerprint = None
+        graph._load_csr(csr)
+        return graph
+
+    @classmethod
+    def from_edge_files(cls, edges, arcs=None, columns=('source', 'target'),
+                        chunksize=100000, nodes=None):
+        """Build a compact CausalGraph from files of edges, which are read in
+        chunks without building the graph edge by edge.
+
+        Parameters
+        ----------
+        edges : str
+            Path of the directed edges, a .csv, .parquet or .npz file, see
+            graph_io.read_edges().
+        arcs : str, optional
+            Path of the latent confounding arcs in the same formats. Defaults
+            to None.
+        columns : tuple of str, optional
+            Names of the columns of the sources and targets. Defaults to
+            ('source', 'target').
+        chunksize : int, optional
+            Number of edges read at a time. Defaults to 100000.
+        nodes : list, optional
+            Nodes added before the ones found in the files, e.g., isolated
+            nodes. Defaults to None.
+
+        Returns
+        ----------
+        CausalGraph
+        """
+        return cls.from_csr(graph_io.load_edge_files(
+            edges, arcs, columns=columns, chunksize=chunksize, nodes=nodes
+        ))
+
+    def to_csr(self):
+        """Return the integer-indexed CsrGraph of the structure of the graph,
+        which is cached until the graph is modified.
+
+        Returns
+        ----------
+        CsrGraph
+        """
+        return self._cached(
+            'csr', lambda: CsrGraph.from_maps(self._parents, self._arcs)
+        )
+
+    def save(self, path):
+        """Save the structure of the graph as a binary snapshot, i.e., a
+        directory of the node names and CSR arrays of the graph, see
+        graph_io.save_csr().
+
+        Parameters
+        ----------
+        path : str
+            The directory of the snapshot.
+        """
+        graph_io.save_csr(self.to_csr(), path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a CausalGraph from a snapshot written by save(). The graph is
+        compact, see compact().
+
+        Parameters
+        ----------
+        path : str
+            The directory of the snapshot.
+        mmap : bool, optional
+            If True, memory-map the arrays of the snapshot read-only instead
+            of reading them, so that processes loading the same snapshot
+            share one copy. Defaults to True.
+
+        Returns
+        ----------
+        CausalGraph
+        """
+        return cls.from_csr(graph_io.load_csr(path, mmap=mmap))
+
+    def _modified(self):
+        """Record a structural modification of the graph, which invalidates
+        all cached views.
+        """
+        self.version += 1
+        self._cache.clear()
+
+    def _cached(self, name, build):
+        """Return the view stored under name, building it with build() if it
+        is not cached for the current version of the graph.
+        """
+        try:
+            return self._cache[name]
+        except KeyError:
+            view = build()
+            self._cache[name] = view
+            return view
+
+    def _update_fingerprint(self, kind, *nodes, sign=1):
+        if self._fingerprint is not None:
+            self._fingerprint = (
+                self._fingerprint + sign * element_hash(kind, *nodes)
+            ) & FINGERPRINT_MASK
+
+    def _add_node(self, node):
+        if node not in self._parents:
+            self._parents[node] = {}
+            self._children[node] = {}
+            self._update_fingerprint('n', node)
+            if self._c_components is not None:
+                self._c_components.add(node)
+            if self._topo is not None:
+                self._topo.add_node(node)
+
+    def _add_edge(self, s, t):
+        self._add_node(s)
+        self._add_node(t)
+        if self._topo is not None:
+            self._topo.add_edge(s, t, self._parents, self._children)
+        if s not in self._parents[t]:
+            self._update_fingerprint('e', s, t)
+        self._parents.mutable(t)[s] = None
+        self._children.mutable(s)[t] = None
+
+    def _remove_edge(self, s, t):
+        if s not in self._parents.get(t, ()):
+            raise nx.NetworkXError(f'The edge {s}-{t} is not in the graph.')
+        self._update_fingerprint('e', s, t, sign=-1)
+        del self._parents.mutable(t)[s]
+        del self._children.mutable(s)[t]
+
+    def _add_arcs(self, arcs):
+        for s, t in arcs:
+            self._add_node(s)
+            self._add_node(t)
+            if t not in self._arcs.get(s, ()):
+                self._update_fingerprint('a', s, t)
+            self._arcs.mutable(s).add(t)
+            self._arcs.mutable(t).add(s)
+            if self._c_components is not None:
+                self._c_components.union(s, t)
+
+    def _remove_arcs(self, arcs):
+        for s, t in arcs:
+            if t in self._arcs.get(s, ()):
+                self._update_fingerprint('a', s, t, sign=-1)
+            for u, w in ((s, t), (t, s)):
+                if w in self._arcs.get(u, ()):
+                    self._c_components = None
+                    neighbours = self._arcs.mutable(u)
+                    neighbours.discard(w)
+                    if not neighbours:
+                        del self._arcs[u]
+
+    def _remove_nodes(self, nodes):
+        nodes = {node for node in nodes if node in self._parents}
+        if not nodes:
+            return
+
+        # only the neighbours of the removed nodes are touched
+        self._c_components = None
+        removed_arcs = set()
+        for node in nodes:
+            self._update_fingerprint('n', node, sign=-1)
+            for parent in self._parents[node]:
+                self._update_fingerprint('e', parent, node, sign=-1)
+                if parent not in nodes:
+                    del self._children.mutable(parent)[node]
+            for child in self._children[node]:
+                if child not in nodes:
+                    self._update_fingerprint('e', node, child, sign=-1)
+                    del self._parents.mutable(child)[node]
+            for w in self._arcs.get(node, ()):
+                arc = frozenset((node, w))
+                if arc not in removed_arcs:
+                    removed_arcs.add(arc)
+                    self._update_fingerprint('a', node, w, sign=-1)
+            del self._parents[node]
+            del self._children[node]
+            if self._topo is not None:
+                self._topo.remove_node(node)
+            for w in self._arcs.get(node, ()):
+                if w not in nodes:
+                    neighbours = self._arcs.mutable(w)
+                    neighbours.discard(node)
+                    if not neighbours:
+                        del self._arcs[w]
+            if node in self._arcs:
+                del self._arcs[node]
+
+    @property
+    def fingerprint(self):
+        """Canonical 64-bit hash of the structure of the graph, which does not
+        depend on the order in which nodes, edges and arcs were added.
+
+        It is the sum modulo 2 ** 64 of stable hashes of every node, directed
+        edge and latent confounding arc, so it is computed once in O(V + E)
+        and then updated in O(1) by every modification. Structurally
+        identical graphs have equal fingerprints, also across processes.
+
+        Returns
+        ----------
+        int
+        """
+        if self._fingerprint is None:
+            total = sum(element_hash('n', node) for node in self._parents)
+            total += sum(
+                element_hash('e', parent, node)
+                for node, parents in self._parents.items()
+                for parent in parents
+            )
+            total += sum(
+                element_hash('a', s, t)
+                for s, t in self.latent_confounding_arcs
+            )
+            self._fingerprint = total & FINGERPRINT_MASK
+        return self._fingerprint
+
+    @property
+    def causation(self):
+        return CausationView(self._parents)
+
+    @property
+    def dag(self):
+        return self._cached('dag', self._build_dag)
+
+    def _build_dag(self):
+        dag = nx.MultiDiGraph()
+        dag.add_nodes_from(self._parents)
+        dag.add_edges_from(
+            (parent, node, 0)
+            for node, parents in self._parents.items() for parent in parents
+        )
+        dag.add_edges_from(
+            (node, w, 'n')
+            for node, neighbours in self._arcs.items() for w in neighbours
+        )
+        return nx.freeze(dag)
 
     @property
     def prob(self):
@@ -101,48 +479,218 @@ class CausalGraph:
         Returns
         ----------
         list
-
+            Each arc is listed once as a tuple of its two endpoints.
         """
-        W = nx.to_numpy_matrix(self.dag)
-        a, w_t = np.where(W >= 1), W.T.A
-        arcs, nodes = [], list(self.dag.nodes)
-        for row, col in zip(a[0], a[1]):
-            if w_t[row][col] >= 1 and (nodes[col], nodes[row]) not in arcs:
-                arcs.append((nodes[row], nodes[col]))
+        arcs, visited = [], set()
+        for node, neighbours in self._arcs.items():
+            arcs.extend((node, w) for w in neighbours if w not in visited)
+            visited.add(node)
         return arcs
 
     @property
     def is_dag(self):
-        """Verify whether the constructed graph is a DAG.
+        """Verify whether the constructed graph is a DAG. This costs O(1) if
+        the topological order is maintained, see maintain_topo_order().
         """
         # TODO: determin if the graph is a DAG, try tr(e^{W\circledot W}-d)=0
+        if self._topo is not None:
+            return True
         return nx.is_directed_acyclic_graph(self.observed_dag)
 
-    def to_adj_matrix(self):
+    def maintain_topo_order(self, maintain=True):
+        """Maintain a topological order of the observed graph while edges are
+        added, so that is_dag and topo_order need no traversal of the graph
+        and every edge closing a directed cycle is rejected with a
+        CycleError. The order is inherited by copies.
+
+        Parameters
+        ----------
+        maintain : bool, optional
+            Stop maintaining the order if False. Defaults to True.
+
+        Raises
+        ----------
+        CycleError
+            If the graph already contains a directed cycle.
+        """
+        if not maintain:
+            self._topo = None
+            return
+        if self._topo is not None:
+            return
+
+        try:
+            order = list(self.topo_order)
+        except nx.NetworkXUnfeasible:
+            cycle = nx.find_cycle(self.observed_dag)
+            raise CycleError(
+                'The graph contains a directed cycle.',
+                [edge[:2] for edge in cycle]
+            )
+        self._topo = TopologicalOrder(order)
+
+    def to_adj_matrix(self, sparse=False):
         """Return the adjacency matrix.
+
+        Parameters
+        ----------
+        sparse : bool, optional
+            If True, return scipy.sparse matrices built from the CsrGraph of
+            the graph without densifying it. Defaults to False.
+
+        Returns
+        ----------
+        np.matrix or tuple of scipy.sparse.csr_matrix
+            If not sparse, the dense adjacency matrix of dag. Otherwise
+            (directed, bidirected), where directed[i, j] is 1 if there is an
+            edge from the i-th node to the j-th node and the symmetric
+            bidirected has the latent confounding arcs. Nodes are ordered as
+            in causation.
         """
-        W = nx.to_numpy_matrix(self.dag)
-        return W
+        if not sparse:
+            W = nx.to_numpy_matrix(self.dag)
+            return W
+
+        from scipy.sparse import csr_matrix
+
+        csr = self.to_csr()
+        n = len(csr)
+
+        def to_matrix(indptr, indices):
+            # copy so that sorting the indices keeps csr intact
+            matrix = csr_matrix(
+                (np.ones(len(indices), dtype=np.int8), indices, indptr),
+                shape=(n, n), copy=True
+            )
+            matrix.sort_indices()
+            return matrix
+
+        return to_matrix(*csr.children), to_matrix(*csr.arcs)
 
     def to_adj_list(self):
-        """Return the adjacency list."""
-        pass
+        """Return the adjacency list.
+
+        Returns
+        ----------
+        list of np.ndarray
+            The i-th array contains the indices of the children of the i-th
+            node, where nodes are ordered as in causation. The arrays are
+            read-only views of the CsrGraph of the graph.
+        """
+        indptr, indices = self.to_csr().children
+        adj_list = np.split(indices, indptr[1:-1])
+        for children in adj_list:
+            children.flags.writeable = False
+        return adj_list
 
-    def is_d_separated(self, x, y, test_set):
-        """Check if test_set d-separates x and y.
+    def is_d_separated(self, x, y, test_set, cut_outgoing=None):
+        """Check if test_set d-separates x and y. Latent confounding arcs are
+        treated as unobserved common parents without building
+        explicit_unob_var_dag, and each test takes O(V + E).
 
         Parameters
         ----------
         x : set of str
         y : set of str
         test_set : set of str
+        cut_outgoing : set of str, optional
+            If given, test d-separation in the graph where outgoing edges of
+            these nodes are removed, e.g., the treatments for the backdoor
+            criterion. Defaults to None.
 
         Returns
         ----------
         Bool
             If test_set d-separates x and y, return True else return False.
         """
-        return nx.d_separated(self.explicit_unob_var_dag, x, y, test_set)
+        return self.d_separation.is_d_separated(x, y, test_set, cut_outgoing)
+
+    def is_d_separated_many(self, x, y, test_sets, cut_outgoing=None,
+                            n_jobs=None):
+        """Check if each set in test_sets d-separates x and y. All tests
+        share the preprocessing of the graph.
+
+        Parameters
+        ----------
+        x : set of str
+        y : set of str
+        test_sets : list of set of str
+        cut_outgoing : set of str, optional
+            See is_d_separated(). Defaults to None.
+        n_jobs : int, optional
+            If larger than 1, large batches are split over a pool of n_jobs
+            processes. Defaults to None.
+
+        Returns
+        ----------
+        list of bool
+            One result for every set in test_sets.
+        """
+        return self.d_separation.is_d_separated_many(
+            x, y, test_sets, cut_outgoing, n_jobs
+        )
+
+    def is_d_separated_batch(self, queries, cut_outgoing=None, n_jobs=None):
+        """Check if z d-separates x and y for every (x, y, z) in queries. All
+        tests share the preprocessing of the graph.
+
+        Parameters
+        ----------
+        queries : list of tuple
+            Each element contains three sets of str (x, y, z).
+        cut_outgoing : set of str, optional
+            See is_d_separated(). Defaults to None.
+        n_jobs : int, optional
+            If larger than 1, large batches are split over a pool of n_jobs
+            processes. Defaults to None.
+
+        Returns
+        ----------
+        list of bool
+            One result for every query.
+        """
+        return self.d_separation.is_d_separated_batch(
+            queries, cut_outgoing, n_jobs
+        )
+
+    @property
+    def d_separation(self):
+        """The DSeparation engine of the graph, which is built on first access
+        after every modification and caches ancestors of conditioning sets.
+
+        Returns
+        ----------
+        DSeparation
+        """
+        return self._cached(
+            'd_separation', lambda: DSeparation(self.to_csr())
+        )
+
+    @property
+    def separators(self):
+        """The SeparatorSearch of the graph, which finds d-separating sets,
+        e.g., backdoor adjustment sets, in polynomial time.
+
+        Returns
+        ----------
+        SeparatorSearch
+        """
+        return self._cached(
+            'separators', lambda: SeparatorSearch(self.d_separation)
+        )
+
+    @property
+    def frontdoor_sets(self):
+        """The FrontdoorSearch of the graph, which finds frontdoor adjustment
+        sets in polynomial time.
+
+        Returns
+        ----------
+        FrontdoorSearch
+        """
+        return self._cached(
+            'frontdoor_sets', lambda: FrontdoorSearch(self.d_separation)
+        )
 
     @property
     def c_components(self):
@@ -150,13 +698,51 @@ class CausalGraph:
 
         Returns
         ----------
-        set of str
+        generator of set of str
             The C-component set of the graph
         """
-        bi_directed_graph = nx.Graph()
-        bi_directed_graph.add_nodes_from(self.dag.nodes)
-        bi_directed_graph.add_edges_from(self.latent_confounding_arcs)
-        return nx.connected_components(bi_directed_graph)
+        components, _ = self._c_partition()
+        return (set(c) for c in components)
+
+    def c_component_of(self, node):
+        """Return the C-component containing node.
+
+        Parameters
+        ----------
+        node : str
+
+        Returns
+        ----------
+        frozenset of str
+        """
+        _, member = self._c_partition()
+        try:
+            return member[node]
+        except KeyError:
+            raise nx.NodeNotFound(f'The node {node} is not in the graph.')
+
+    def _c_partition(self):
+        """Return the list of C-components and the map from every node to
+        its C-component, which are cached until the graph is modified.
+        """
+        return self._cached('c_components', self._build_c_partition)
+
+    def _build_c_partition(self):
+        if self._c_components is None:
+            components = UnionFind()
+            for node in self._parents:
+                components.add(node)
+            for node, neighbours in self._arcs.items():
+                for w in neighbours:
+                    components.union(node, w)
+            self._c_components = components
+
+        groups = {}
+        for node in self._parents:
+            groups.setdefault(self._c_components.find(node), []).append(node)
+        components = [frozenset(group) for group in groups.values()]
+        member = {node: c for c in components for node in c}
+        return components, member
 
     def ancestors(self, x):
         """Return the ancestors of all nodes in x.
@@ -171,14 +757,78 @@ class CausalGraph:
         set of str
             Ancestors of nodes x of the graph
         """
-        an = set()
-        for node in x:
-            an.add(node)
-            try:
-                an.update(nx.ancestors(self.observed_dag, node))
-            except Exception:
-                pass
-        return an
+        if self.reachability_index:
+            return self.reachability.ancestors(x)
+        return self._reach(x, self._parents)
+
+    def descendants(self, x):
+        """Return the descendants of all nodes in x.
+
+        Parameters
+        ----------
+        x : set of str
+            a set of nodes in the graph
+
+        Returns
+        ----------
+        set of str
+            Descendants of nodes x of the graph, including x
+        """
+        if self.reachability_index:
+            return self.reachability.descendants(x)
+        return self._reach(x, self._children)
+
+    def ancestors_many(self, sets):
+        """Return the ancestors of every set of nodes in sets with a single
+        batch of queries to the ReachabilityIndex of the graph.
+
+        Parameters
+        ----------
+        sets : list of set of str
+
+        Returns
+        ----------
+        list of set of str
+        """
+        return self.reachability.ancestors_many(sets)
+
+    def descendants_many(self, sets):
+        """Return the descendants of every set of nodes in sets with a single
+        batch of queries to the ReachabilityIndex of the graph.
+
+        Parameters
+        ----------
+        sets : list of set of str
+
+        Returns
+        ----------
+        list of set of str
+        """
+        return self.reachability.descendants_many(sets)
+
+    def _reach(self, x, neighbours):
+        """Return x and all nodes reachable from x through neighbours."""
+        reached = set(x)
+        queue = deque(node for node in reached if node in neighbours)
+        while queue:
+            for w in neighbours[queue.popleft()]:
+                if w not in reached:
+                    reached.add(w)
+                    queue.append(w)
+        return reached
+
+    @property
+    def reachability(self):
+        """The ReachabilityIndex of the observed graph, which is built on
+        first access after every modification.
+
+        Returns
+        ----------
+        ReachabilityIndex
+        """
+        return self._cached(
+            'reachability', lambda: ReachabilityIndex(self.to_csr())
+        )
 
     @property
     def observed_dag(self):
@@ -188,15 +838,19 @@ class CausalGraph:
         Returns
         ----------
         nx.MultiDiGraph
-            The observed part of the graph
+            The observed part of the graph, which is frozen since it is
+            shared by all readers until the graph is modified.
         """
-        edges = []
-        for k, v in self.causation.items():
-            for para in v:
-                edges.append((para, k, 0))
+        return self._cached('observed_dag', self._build_observed_dag)
+
+    def _build_observed_dag(self):
         ob_dag = nx.MultiDiGraph()
-        ob_dag.add_edges_from(edges)
-        return ob_dag
+        ob_dag.add_nodes_from(self._parents)
+        ob_dag.add_edges_from(
+            (parent, node, 0)
+            for node, parents in self._parents.items() for parent in parents
+        )
+        return nx.freeze(ob_dag)
 
     @property
     def explicit_unob_var_dag(self):
@@ -206,13 +860,32 @@ class CausalGraph:
         Returns
         ----------
         nx.MultiDiGraph
+            Frozen, see observed_dag.
         """
-        new_dag = self.observed_dag
+        return self._cached(
+            'explicit_unob_var_dag', self._build_explicit_unob_var_dag
+        )
+
+    def _build_explicit_unob_var_dag(self):
+        new_dag = self.observed_dag.copy()
         for i, (node1, node2) in enumerate(self.latent_confounding_arcs):
             new_dag.add_edges_from(
                 [(f'U{i}', node1, 'n'), (f'U{i}', node2, 'n')]
             )
-        return new_dag
+        return nx.freeze(new_dag)
+
+    @property
+    def paths(self):
+        """The PathAnalysis of explicit_unob_var_dag, which is built on first
+        access after every modification.
+
+        Returns
+        ----------
+        PathAnalysis
+        """
+        return self._cached(
+            'paths', lambda: PathAnalysis(self.explicit_unob_var_dag)
+        )
 
     @property
     def topo_order(self):
@@ -220,10 +893,17 @@ class CausalGraph:
 
         Returns
         ----------
-        generator
+        iterator
             Nodes in the topological order
         """
-        return nx.topological_sort(self.observed_dag)
+        if self._topo is not None:
+            order = self._cached('topo_order', self._topo.order)
+        else:
+            order = self._cached(
+                'topo_order',
+                lambda: list(nx.topological_sort(self.observed_dag))
+            )
+        return iter(order)
 
     def add_nodes(self, nodes, new=False):
         """
@@ -240,21 +920,14 @@ class CausalGraph:
         ----------
         CausalGraph
         """
-        ori_nodes = self.dag.nodes
+        if new:
+            graph = self.copy()
+            graph.add_nodes(nodes)
+            return graph
 
-        if not new:
-            self.dag.add_nodes_from(nodes)
-            for node in nodes:
-                if node not in ori_nodes:
-                    self.causation[node] = []
-        else:
-            new_dag = deepcopy(self.dag)
-            new_causation = deepcopy(self.causation)
-            new_dag.add_nodes_from(nodes)
-            for node in nodes:
-                if node not in ori_nodes:
-                    new_causation[node] = []
-            return CausalGraph(new_causation, dag=new_dag)
+        for node in nodes:
+            self._add_node(node)
+        self._modified()
 
     def add_edges_from(self, edge_list, new=False, observed=True):
         """
@@ -269,30 +942,27 @@ class CausalGraph:
             Return a new graph if set as True
         observed : bool
             Add unobserved bidirected confounding arcs if not observed.
+
+        Raises
+        ----------
+        CycleError
+            If the topological order is maintained and an edge closes a
+            directed cycle.
         """
-        if not new:
-            if observed:
-                for edge in edge_list:
-                    self.causation[edge[1]].append(edge[0])
-                    self.dag.add_edge(edge[0], edge[1], 0)
-            else:
-                for edge in edge_list:
-                    self.dag.add_edges_from(
-                        [(edge[0], edge[1], 'n'), (edge[1], edge[0], 'n')]
-                    )
-        else:
-            new_dag = deepcopy(self.dag)
-            new_causation = deepcopy(self.causation)
+        if new:
+            graph = self.copy()
+            graph.add_edges_from(edge_list, observed=observed)
+            return graph
+
+        # edges preceding one rejected by the topological order are kept
+        try:
             if observed:
-                new_dag.add_edges_from(edge_list)
                 for edge in edge_list:
-                    new_causation[edge[1]].append(edge[0])
+                    self._add_edge(edge[0], edge[1])
             else:
-                for edge in edge_list:
-                    new_dag.add_edges_from(
-                        [(edge[0], edge[1], 'n'), (edge[1], edge[0], 'n')]
-                    )
-            return CausalGraph(new_causation, dag=new_dag)
+                self._add_arcs(edge[:2] for edge in edge_list)
+        finally:
+            self._modified()
 
     def add_edge(self, s, t, observed=True):
         """
@@ -307,12 +977,20 @@ class CausalGraph:
             Target of the edge.
         observed : bool
             Add an unobserved latent confounding arc if False.
+
+        Raises
+        ----------
+        CycleError
+            If the topological order is maintained and the edge closes a
+            directed cycle.
         """
-        if observed:
-            self.dag.add_edge(s, t, 0)
-            self.causation[t].append(s)
-        else:
-            self.dag.add_edge(s, t, 'n')
+        try:
+            if observed:
+                self._add_edge(s, t)
+            else:
+                self._add_arcs([(s, t)])
+        finally:
+            self._modified()
 
     def remove_nodes(self, nodes, new=False):
         """
@@ -330,32 +1008,13 @@ class CausalGraph:
         CausalGraph
             Return a CausalGraph if new.
         """
-        if not new:
-            for node in nodes:
-                for k in list(self.causation.keys()):
-                    if k == node:
-                        del self.causation[node]
-                        continue
-                    try:
-                        self.causation[k].remove(node)
-                    except Exception:
-                        pass
-            self.dag.remove_nodes_from(nodes)
-        else:
-            new_causation = deepcopy(self.causation)
-            new_dag = deepcopy(self.dag)
-            new_dag.remove_nodes_from(nodes)
-
-            for node in nodes:
-                for k in list(new_causation.keys()):
-                    if k == node:
-                        del new_causation[node]
-                        continue
-                    try:
-                        new_causation[k].remove(node)
-                    except Exception:
-                        pass
-            return CausalGraph(new_causation, dag=new_dag)
+        if new:
+            graph = self.copy()
+            graph.remove_nodes(nodes)
+            return graph
+
+        self._remove_nodes(nodes)
+        self._modified()
 
     def remove_edge(self, edge, observed=True):
         """
@@ -370,15 +1029,10 @@ class CausalGraph:
             If not observed, remove the unobserved latent confounding arcs.
         """
         if observed:
-            self.dag.remove_edge(edge[0], edge[1], 0)
-            try:
-                self.causation[edge[1]].remove(edge[0])
-            except Exception:
-                pass
+            self._remove_edge(edge[0], edge[1])
         else:
-            self.dag.remove_edges_from(
-                [(edge[0], edge[1], 'n'), (edge[1], edge[0], 'n')]
-            )
+            self._remove_arcs([edge[:2]])
+        self._modified()
 
     def remove_edges_from(self, edge_list, new=False, observed=True):
         """
@@ -397,48 +1051,35 @@ class CausalGraph:
         CausalGraph
             Return a new CausalGraph if new.
         """
-        if not new:
-            if observed:
-                for edge in edge_list:
-                    self.dag.remove_edge(edge[0], edge[1], 0)
-                    try:
-                        self.causation[edge[1]].remove(edge[0])
-                    except Exception:
-                        pass
-            else:
-                for edge in edge_list:
-                    self.dag.remove_edges_from(
-                        [(edge[0], edge[1], 'n'), (edge[1], edge[0], 'n')]
-                    )
+        if new:
+            graph = self.copy()
+            graph.remove_edges_from(edge_list, observed=observed)
+            return graph
+
+        if observed:
+            for edge in edge_list:
+                self._remove_edge(edge[0], edge[1])
         else:
-            new_dag = deepcopy(self.dag)
-            new_causation = deepcopy(self.causation)
-            if observed:
-                for edge in edge_list:
-                    new_dag.remove_edge(edge[0], edge[1], 0)
-                    try:
-                        new_causation[edge[1]].remove(edge[0])
-                    except Exception:
-                        pass
-            else:
-                for edge in edge_list:
-                    new_dag.remove_edges_from(
-                        [(edge[0], edge[1], 'n'), (edge[1], edge[0], 'n')]
-                    )
-            return CausalGraph(new_causation, new_dag)
+            self._remove_arcs(edge[:2] for edge in edge_list)
+        self._modified()
 
-    def build_sub_graph(self, subset):
+    def build_sub_graph(self, subset, view=False):
         """Return a new CausalGraph as the subgraph of the graph with nodes in the
         subset.
 
         Parameters
         ----------
         subset : set
+        view : bool, optional
+            If True, return a SubGraphView filtering the structure of the
+            graph instead of copying it. Defaults to False.
 
         Returns
         ----------
         CausalGraph
         """
+        if view:
+            return SubGraphView(self, subset)
         nodes = set(self.causation.keys()).difference(subset)
         return self.remove_nodes(nodes, new=True)
 
@@ -458,22 +1099,18 @@ class CausalGraph:
             If new, return a subgraph of the graph without all incoming edges
             of nodes in x
         """
-        edges = self.dag.in_edges(x, keys=True)
         o_edges, u_edges = [], []
+        for node in x:
+            o_edges.extend(
+                (parent, node) for parent in self._parents.get(node, ())
+            )
+            u_edges.extend((w, node) for w in self._arcs.get(node, ()))
 
-        for edge in edges:
-            if edge[2] == 'n':
-                u_edges.append(edge)
-            else:
-                o_edges.append(edge)
-
+        graph = self.copy() if new else self
+        graph.remove_edges_from(o_edges)
+        graph.remove_edges_from(u_edges, observed=False)
         if new:
-            return self.remove_edges_from(o_edges, new).remove_edges_from(
-                u_edges, new, observed=False
-            )
-        else:
-            self.remove_edges_from(o_edges, new)
-            self.remove_edges_from(u_edges, new, observed=False)
+            return graph
 
     def remove_outgoing_edges(self, x, new=False):
         """Remove outcoming edges of all nodes in x.
@@ -490,6 +1127,130 @@ class CausalGraph:
             of nodes in x.
         """
         removing_edges = [
-            edge for edge in self.dag.out_edges(x, keys=True) if edge[2] == 0
+            (node, child) for node in x
+            for child in self._children.get(node, ())
         ]
         return self.remove_edges_from(removing_edges, new, observed=True)
+
+
+class SubGraphView(CausalGraph):
+    """
+    Read-only view of the subgraph of a CausalGraph induced by a set of
+    nodes, which filters the nodes and edges of the graph through a mask
+    instead of copying them.
+
+    The view reads a fork of the structure of the graph, so later
+    modifications of the graph are not visible in it. All queries of
+    CausalGraph work on the view. It is materialized into a CausalGraph of
+    its own the first time it is modified, and copies of the view and
+    subgraphs built from it are views over the same structure.
+
+    Attributes
+    ----------
+    is_view : bool
+        False once the view is materialized.
+    """
+
+    def __init__(self, graph, subset):
+        """
+        Parameters
+        ----------
+        graph : CausalGraph
+        subset : set
+            Nodes of the subgraph. Nodes not in graph are ignored.
+        """
+        subset = subset if isinstance(subset, (set, frozenset, dict)) \
+            else set(subset)
+        if isinstance(graph, SubGraphView) and graph.is_view:
+            base = graph._parents.base, graph._children.base, \
+                graph._arcs.base
+            nodes = graph._parents.mask
+        else:
+            base = graph._parents.fork(), graph._children.fork(), \
+                graph._arcs.fork()
+            nodes = graph._parents
+        mask = dict.fromkeys(node for node in nodes if node in subset)
+        self._init_view(base, mask)
+
+    def _init_view(self, base, mask):
+        self.version = 0
+        self.reachability_index = False
+        self._cache = {}
+        self._parents, self._children, self._arcs = (
+            MaskedMap(m, mask) for m in base
+        )
+        self._c_components = None
+        self._topo = None
+        self._fingerprint = None
+
+    @property
+    def is_view(self):
+        return isinstance(self._parents, MaskedMap)
+
+    def _materialize(self):
+        """Copy the structure of the view into maps owned by the graph."""
+        if not self.is_view:
+            return
+
+        parents, children = CowMap(dict.fromkeys), CowMap(dict.fromkeys)
+        arcs = CowMap(set)
+        for node in self._parents:
+            parents[node] = dict.fromkeys(self._parents[node])
+            children[node] = dict.fromkeys(self._children[node])
+        for node, neighbours in self._arcs.items():
+            if neighbours:
+                arcs[node] = set(neighbours)
+        self._parents, self._children, self._arcs = parents, children, arcs
+
+    def copy(self):
+        """Return a new view of the same subgraph, or a copy of the graph if
+        it is materialized.
+
+        Returns
+        ----------
+        CausalGraph
+        """
+        if not self.is_view:
+            return super().copy()
+
+        graph = SubGraphView.__new__(SubGraphView)
+        graph._init_view(
+            (self._parents.base, self._children.base, self._arcs.base),
+            self._parents.mask
+        )
+        graph._cache = dict(self._cache)
+        graph._topo = None if self._topo is None else self._topo.fork()
+        graph._fingerprint = self._fingerprint
+        return graph
+
+    def remove_nodes(self, nodes, new=False):
+        if new and self.is_view:
+            nodes = set(nodes)
+            return SubGraphView(
+                self, [node for node in self._parents if node not in nodes]
+            )
+        return super().remove_nodes(nodes, new)
+
+    def _add_node(self, node):
+        self._materialize()
+        super()._add_node(node)
+
+    def _add_edge(self, s, t):
+        self._materialize()
+        super()._add_edge(s, t)
+
+    def _remove_edge(self, s, t):
+        self._materialize()
+        super()._remove_edge(s, t)
+
+    def _add_arcs(self, arcs):
+        self._materialize()
+        super()._add_arcs(arcs)
+
+    def _remove_arcs(self, arcs):
+        self._materialize()
+        super()._remove_arcs(arcs)
+
+    def _remove_nodes(self, nodes):
+        self._materialize()
+        super()._remove_nodes(nodes)
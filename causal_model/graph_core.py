@@ -0,0 +1,525 @@
+import numpy as np
+
+from hashlib import blake2b
+from collections.abc import Mapping, MutableMapping
+
+
+# Maximal number of shared layers below a CowMap before they are flattened
+# into a single one, which bounds the cost of a lookup.
+MAX_DEPTH = 16
+
+# Fingerprints are sums of element hashes modulo 2 ** 64.
+FINGERPRINT_MASK = (1 << 64) - 1
+
+_MISSING = object()
+_REMOVED = object()
+
+
+class Layer:
+    """
+    Immutable layer of a CowMap. A layer stores the entries written after
+    its parent layer was frozen, where removed keys are marked by a sentinel.
+
+    Attributes
+    ----------
+    data : dict
+    parent : Layer or None
+    depth : int
+        Number of layers below this one.
+    """
+
+    __slots__ = ('data', 'parent', 'depth')
+
+    def __init__(self, data, parent=None):
+        self.data = data
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    def lookup(self, key):
+        layer = self
+        while isinstance(layer, Layer):
+            value = layer.data.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            layer = layer.parent
+        return _MISSING if layer is None else layer.lookup(key)
+
+    def keys(self):
+        return self.data.keys()
+
+
+class CowMap(MutableMapping):
+    """
+    Copy-on-write mapping from nodes to containers of nodes.
+
+    Entries live in a chain of immutable layers shared with the maps forked
+    from the same ancestor, plus a local dict owned by this map. Forking
+    freezes the local dict into a new layer, so it costs O(1) and both the
+    original and the forked map only pay for the entries they change
+    afterwards. Containers read from the map are shared and must not be
+    mutated, use mutable() to get a private copy.
+
+    Methods
+    ----------
+    mutable(key)
+        Return the container of key owned by this map.
+    fork()
+        Return a new CowMap sharing all current entries with this map.
+    """
+
+    def __init__(self, factory, base=None, size=0):
+        """
+        Parameters
+        ----------
+        factory : type
+            Builds a container from an iterable of nodes, e.g. set or
+            dict.fromkeys.
+        base : Layer, optional
+            Shared layers of the map. Defaults to None.
+        size : int, optional
+            Number of keys in base. Defaults to 0.
+        """
+        self._factory = factory
+        self._base = base
+        self._local = {}
+        self._size = size
+
+    def _lookup(self, key):
+        value = self._local.get(key, _MISSING)
+        if value is _MISSING and self._base is not None:
+            value = self._base.lookup(key)
+        return value
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is _MISSING or value is _REMOVED:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        value = self._lookup(key)
+        return value is not _MISSING and value is not _REMOVED
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._size += 1
+        self._local[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._size -= 1
+        if self._base is not None and self._base.lookup(key) not in (
+            _MISSING, _REMOVED
+        ):
+            self._local[key] = _REMOVED
+        else:
+            del self._local[key]
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        if self._base is None:
+            yield from self._local
+            return
+
+        layers, layer = [self._local], self._base
+        while layer is not None:
+            layers.append(layer)
+            layer = layer.parent
+
+        # keys are yielded in the order they were first inserted
+        seen = set()
+        for layer in reversed(layers):
+            for key in layer.keys():
+                if key not in seen:
+                    seen.add(key)
+                    if key in self:
+                        yield key
+
+    def mutable(self, key):
+        """Return the container of key owned by this map, copying it from the
+        shared layers or creating an empty one if necessary.
+        """
+        value = self._local.get(key, _MISSING)
+        if value is _MISSING or value is _REMOVED:
+            shared = _MISSING
+            if value is _MISSING and self._base is not None:
+                shared = self._base.lookup(key)
+            if shared is _MISSING or shared is _REMOVED:
+                self._size += 1
+                value = self._factory(())
+            else:
+                value = self._factory(shared)
+            self._local[key] = value
+        return value
+
+    def fork(self):
+        """Return a new CowMap sharing all current entries with this map.
+
+        Returns
+        ----------
+        CowMap
+        """
+        if self._local:
+            self._base = Layer(self._local, self._base)
+            self._local = {}
+            if self._base.depth > MAX_DEPTH:
+                self._flatten()
+        return CowMap(self._factory, self._base, self._size)
+
+    def _flatten(self):
+        """Merge the shared dict layers into a single one, keeping a CsrLayer
+        at the bottom of the chain.
+        """
+        chain, layer = [], self._base
+        while layer is not None:
+            chain.append(layer)
+            layer = layer.parent
+        bottom = None if isinstance(chain[-1], Layer) else chain.pop()
+
+        data = {}
+        for layer in reversed(chain):
+            data.update(layer.data)
+        if bottom is None:
+            data = {k: v for k, v in data.items() if v is not _REMOVED}
+        self._base = Layer(data, bottom)
+
+
+class UnionFind:
+    """
+    Disjoint sets of nodes with union by size and path halving. Parent
+    pointers and sizes are stored in CowMaps, so forking costs O(1).
+
+    Methods
+    ----------
+    add(node)
+        Add node as a singleton set if it is not in the structure.
+    find(node)
+        Return the representative of the set of node.
+    union(a, b)
+        Merge the sets of a and b.
+    fork()
+        Return a new UnionFind sharing all current sets with this one.
+    """
+
+    def __init__(self, parent=None, size=None):
+        self._parent = CowMap(None) if parent is None else parent
+        self._size = CowMap(None) if size is None else size
+
+    def __contains__(self, node):
+        return node in self._parent
+
+    def add(self, node):
+        if node not in self._parent:
+            self._parent[node] = node
+            self._size[node] = 1
+
+    def find(self, node):
+        parent = self._parent
+        while True:
+            p = parent[node]
+            if p == node:
+                return node
+            grandparent = parent[p]
+            if grandparent != p:
+                parent[node] = grandparent
+            node = grandparent
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+
+    def fork(self):
+        """Return a new UnionFind sharing all current sets with this one.
+
+        Returns
+        ----------
+        UnionFind
+        """
+        return UnionFind(self._parent.fork(), self._size.fork())
+
+
+def element_hash(kind, *nodes):
+    """Return a 64-bit hash of an element of a graph that is stable across
+    processes, where kind is 'n' for nodes, 'e' for directed edges and 'a'
+    for latent confounding arcs, whose endpoints are unordered.
+    """
+    keys = [repr(node) for node in nodes]
+    if kind == 'a':
+        keys.sort()
+    digest = blake2b(
+        '\x00'.join([kind] + keys).encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class CausationView(Mapping):
+    """
+    Read-only view of the parents of every node, where values are lists.
+    """
+
+    def __init__(self, parents):
+        self._parents = parents
+
+    def __getitem__(self, node):
+        return list(self._parents[node])
+
+    def __contains__(self, node):
+        return node in self._parents
+
+    def __iter__(self):
+        return iter(self._parents)
+
+    def __len__(self):
+        return len(self._parents)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class MaskedMap(Mapping):
+    """
+    Read-only view of a map from nodes to containers of nodes restricted to
+    the nodes of a mask, where values are tuples.
+
+    Attributes
+    ----------
+    base : Mapping
+    mask : dict
+        Keys are the nodes of the view in the order of base.
+    """
+
+    def __init__(self, base, mask):
+        self.base = base
+        self.mask = mask
+
+    def __getitem__(self, node):
+        if node not in self.mask:
+            raise KeyError(node)
+        mask = self.mask
+        return tuple(w for w in self.base[node] if w in mask)
+
+    def __contains__(self, node):
+        return node in self.mask and node in self.base
+
+    def __iter__(self):
+        base = self.base
+        return (node for node in self.mask if node in base)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class CsrLayer:
+    """
+    Immutable bottom layer of a CowMap backed by one adjacency of a CsrGraph.
+
+    Attributes
+    ----------
+    csr : CsrGraph
+    indptr : np.ndarray
+    indices : np.ndarray
+    sparse : bool
+        If True, nodes without neighbours are not keys of the layer.
+    """
+
+    __slots__ = ('csr', 'indptr', 'indices', 'sparse')
+
+    parent = None
+    depth = 0
+
+    def __init__(self, csr, indptr, indices, sparse=False):
+        self.csr = csr
+        self.indptr = indptr
+        self.indices = indices
+        self.sparse = sparse
+
+    def lookup(self, key):
+        i = self.csr.index.get(key)
+        if i is None:
+            return _MISSING
+        start, end = self.indptr[i], self.indptr[i + 1]
+        if self.sparse and start == end:
+            return _MISSING
+        names = self.csr.names
+        return tuple(names[j] for j in self.indices[start:end].tolist())
+
+    def keys(self):
+        names = self.csr.names
+        if not self.sparse:
+            return iter(names)
+        return (names[i] for i in np.flatnonzero(np.diff(self.indptr)))
+
+    def __len__(self):
+        if not self.sparse:
+            return len(self.csr.names)
+        return int(np.count_nonzero(np.diff(self.indptr)))
+
+
+class CsrGraph:
+    """
+    Compact integer-indexed snapshot of the structure of a CausalGraph.
+
+    Node names are interned to their position in names, and the parents,
+    children and bidirected neighbours of every node are stored as CSR
+    arrays, i.e., the neighbours of the node i are
+    indices[indptr[i]:indptr[i + 1]].
+
+    Attributes
+    ----------
+    names : list
+        Node names in the order of their indices.
+    index : dict
+        Map from node names to their indices.
+    parents : tuple of np.ndarray
+        (indptr, indices) of the parents of every node.
+    children : tuple of np.ndarray
+        (indptr, indices) of the children of every node.
+    arcs : tuple of np.ndarray
+        (indptr, indices) of the nodes sharing a latent confounding arc with
+        every node.
+
+    Methods
+    ----------
+    from_maps(parents, arcs)
+        Build the CsrGraph from maps of parents and of bidirected neighbours.
+    from_edges(names, edges, arcs)
+        Build the CsrGraph from arrays of integer edges.
+    layer(kind)
+        Return a CsrLayer over one of the adjacencies.
+    """
+
+    def __init__(self, names, parents, arcs, children=None, index=None):
+        """
+        Parameters
+        ----------
+        names : list
+        parents : tuple of np.ndarray
+            (indptr, indices) of the parents of every node.
+        arcs : tuple of np.ndarray
+            (indptr, indices) of the bidirected neighbours of every node.
+        children : tuple of np.ndarray, optional
+            Computed from parents if None. Defaults to None.
+        index : dict, optional
+            Computed from names if None. Defaults to None.
+        """
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)} \
+            if index is None else index
+        self.parents = parents
+        self.arcs = arcs
+        self.children = transpose(*parents) if children is None else children
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        return int(self.parents[0][-1])
+
+    @classmethod
+    def from_maps(cls, parents, arcs):
+        """Build the CsrGraph from maps of parents and of bidirected
+        neighbours.
+
+        Parameters
+        ----------
+        parents : Mapping
+            Keys are all nodes of the graph and values are their parents.
+        arcs : Mapping
+            Values are the nodes sharing a latent confounding arc with the
+            keys.
+
+        Returns
+        ----------
+        CsrGraph
+        """
+        names = list(parents)
+        index = {name: i for i, name in enumerate(names)}
+
+        def pack(neighbours):
+            counts = np.fromiter(
+                (len(neighbours.get(name, ())) for name in names),
+                dtype=np.int64, count=len(names)
+            )
+            indptr = np.zeros(len(names) + 1, dtype=np.int64)
+            np.cumsum(counts, out=indptr[1:])
+            indices = np.fromiter(
+                (index[w] for name in names for w in neighbours.get(name, ())),
+                dtype=index_dtype(len(names)), count=int(indptr[-1])
+            )
+            return indptr, indices
+
+        return cls(names, pack(parents), pack(arcs), index=index)
+
+    @classmethod
+    def from_edges(cls, names, edges, arcs):
+        """Build the CsrGraph from arrays of integer edges.
+
+        Parameters
+        ----------
+        names : list
+        edges : np.ndarray
+            Array of shape (m, 2) where every row is (parent, child).
+        arcs : np.ndarray
+            Array of shape (k, 2) where every row is a latent confounding
+            arc. Every arc should be listed once.
+
+        Returns
+        ----------
+        CsrGraph
+        """
+        n = len(names)
+        parents = group(edges[:, 1], edges[:, 0], n)
+        # a self-loop arc is listed once in the neighbours of its node
+        mirrored = arcs[arcs[:, 0] != arcs[:, 1]]
+        arcs = group(
+            np.concatenate([arcs[:, 0], mirrored[:, 1]]),
+            np.concatenate([arcs[:, 1], mirrored[:, 0]]), n
+        )
+        return cls(names, parents, arcs)
+
+    def layer(self, kind):
+        """Return a CsrLayer over one of the adjacencies.
+
+        Parameters
+        ----------
+        kind : str
+            One of parents, children and arcs.
+
+        Returns
+        ----------
+        CsrLayer
+        """
+        indptr, indices = getattr(self, kind)
+        return CsrLayer(self, indptr, indices, sparse=kind == 'arcs')
+
+
+def index_dtype(n):
+    return np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+
+def group(rows, values, n):
+    """Return the CSR arrays (indptr, indices) where the row i contains the
+    values paired with i, in their original order.
+    """
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, np.asarray(values)[order].astype(index_dtype(n))
+
+
+def transpose(indptr, indices):
+    """Return the CSR arrays of the transposed adjacency."""
+    n = len(indptr) - 1
+    rows = np.repeat(
+        np.arange(n, dtype=index_dtype(n)), np.diff(indptr)
+    )
+    return group(indices, rows, n)
@@ -0,0 +1,216 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from causal_model.graph_core import CsrGraph
+
+# Version of the layout of the directories written by save_csr().
+SNAPSHOT_VERSION = 1
+
+_SNAPSHOT_ARRAYS = ('parents', 'children', 'arcs')
+
+
+def read_edges(path, columns=('source', 'target'), chunksize=100000):
+    """Yield the edges stored in a file in chunks.
+
+    Parameters
+    ----------
+    path : str
+        Path of a .csv file, a .parquet file (requires pyarrow) or a .npz
+        file with one array for each of the columns. CSV and Parquet files
+        are streamed, while the arrays of a .npz file are loaded one at a
+        time.
+    columns : tuple of str, optional
+        Names of the columns of the sources and targets. Defaults to
+        ('source', 'target').
+    chunksize : int, optional
+        Maximal number of edges of every chunk. Defaults to 100000.
+
+    Yields
+    ----------
+    tuple of np.ndarray
+        Sources and targets of the edges of a chunk.
+    """
+    source, target = columns
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        for chunk in pd.read_csv(
+            path, usecols=list(columns), dtype=str, chunksize=chunksize
+        ):
+            yield chunk[source].to_numpy(), chunk[target].to_numpy()
+    elif ext == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Reading parquet files requires pyarrow.')
+
+        for batch in pq.ParquetFile(path).iter_batches(
+            batch_size=chunksize, columns=list(columns)
+        ):
+            yield tuple(
+                batch.column(batch.schema.get_field_index(name)).to_numpy(
+                    zero_copy_only=False
+                ) for name in columns
+            )
+    elif ext == '.npz':
+        with np.load(path, allow_pickle=False) as data:
+            sources = data[source]
+            targets = data[target]
+        for start in range(0, len(sources), chunksize):
+            yield (
+                sources[start:start + chunksize],
+                targets[start:start + chunksize]
+            )
+    else:
+        raise ValueError(f'Not support reading edges from {ext} files.')
+
+
+class _Interner:
+    """Map node names to consecutive integers in the order they are found."""
+
+    def __init__(self):
+        self.names = []
+        self.index = {}
+
+    def __call__(self, values):
+        codes, uniques = pd.factorize(values)
+        ids = np.empty(len(uniques), dtype=np.int64)
+        for i, name in enumerate(uniques.tolist()):
+            j = self.index.get(name)
+            if j is None:
+                j = self.index[name] = len(self.names)
+                self.names.append(name)
+            ids[i] = j
+        return ids[codes]
+
+
+def _read_codes(path, intern, columns, chunksize):
+    chunks = []
+    for sources, targets in read_edges(path, columns, chunksize):
+        codes = intern(np.concatenate([sources, targets]))
+        chunks.append(
+            np.column_stack([codes[:len(sources)], codes[len(sources):]])
+        )
+    if not chunks:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(chunks)
+
+
+def load_edge_files(edges, arcs=None, columns=('source', 'target'),
+                    chunksize=100000, nodes=None):
+    """Build a CsrGraph from files of directed edges and latent confounding
+    arcs. Only the interned integer edges are kept in memory, and repeated
+    edges are merged.
+
+    Parameters
+    ----------
+    edges : str
+        Path of the directed edges, see read_edges().
+    arcs : str, optional
+        Path of the latent confounding arcs. Defaults to None.
+    columns : tuple of str, optional
+        Names of the columns of the sources and targets. Defaults to
+        ('source', 'target').
+    chunksize : int, optional
+        Number of edges read at a time. Defaults to 100000.
+    nodes : list, optional
+        Nodes added before the ones found in the files. Defaults to None.
+
+    Returns
+    ----------
+    CsrGraph
+    """
+    intern = _Interner()
+    if nodes is not None:
+        intern(np.asarray(list(nodes), dtype=object))
+
+    edge_codes = np.unique(
+        _read_codes(edges, intern, columns, chunksize), axis=0
+    )
+    if arcs is None:
+        arc_codes = np.empty((0, 2), dtype=np.int64)
+    else:
+        arc_codes = np.unique(
+            np.sort(_read_codes(arcs, intern, columns, chunksize), axis=1),
+            axis=0
+        )
+
+    return CsrGraph.from_edges(intern.names, edge_codes, arc_codes)
+
+
+def save_csr(csr, path):
+    """Save a CsrGraph as a directory of .npy files, one for the node names
+    and two for each adjacency, plus a small JSON header.
+
+    Parameters
+    ----------
+    csr : CsrGraph
+    path : str
+        The directory, which is created if it does not exist.
+
+    Raises
+    ----------
+    ValueError
+        If the node names are neither all str nor all numbers.
+    """
+    names = np.asarray(csr.names)
+    if names.dtype.kind not in 'Uiuf':
+        raise ValueError(
+            'Only str or numeric node names can be saved in a snapshot.'
+        )
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'names.npy'), names)
+    for kind in _SNAPSHOT_ARRAYS:
+        indptr, indices = getattr(csr, kind)
+        np.save(os.path.join(path, f'{kind}_indptr.npy'), indptr)
+        np.save(os.path.join(path, f'{kind}_indices.npy'), indices)
+
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'num_nodes': len(csr),
+        'num_edges': csr.num_edges,
+    }
+    with open(os.path.join(path, 'header.json'), 'w') as f:
+        json.dump(header, f)
+
+
+def load_csr(path, mmap=True):
+    """Load a CsrGraph saved by save_csr().
+
+    Parameters
+    ----------
+    path : str
+    mmap : bool, optional
+        If True, the adjacency arrays are memory-mapped read-only, so that
+        processes loading the same snapshot share its pages. Defaults to
+        True.
+
+    Returns
+    ----------
+    CsrGraph
+    """
+    with open(os.path.join(path, 'header.json')) as f:
+        header = json.load(f)
+    if header['version'] != SNAPSHOT_VERSION:
+        raise ValueError(
+            f'Not support the snapshot version {header["version"]}.'
+        )
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {}
+    for kind in _SNAPSHOT_ARRAYS:
+        arrays[kind] = tuple(
+            np.load(os.path.join(path, f'{kind}_{part}.npy'), mmap_mode)
+            for part in ('indptr', 'indices')
+        )
+    names = np.load(os.path.join(path, 'names.npy')).tolist()
+    if len(names) != header['num_nodes']:
+        raise ValueError(f'The snapshot at {path} is corrupted.')
+
+    return CsrGraph(
+        names, arrays['parents'], arrays['arcs'],
+        children=arrays['children']
+    )
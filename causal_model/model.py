@@ -2,9 +2,9 @@ import networkx as nx
 import numpy as np
 from sklearn.linear_model import LinearRegression as LR
 
-from copy import deepcopy
+from causal_model.cache import IdentificationCache, decode, encode
 from causal_model.prob import Prob
-from itertools import combinations
+from itertools import combinations, islice
 from estimator_model.meta_learner import SLearner, TLearner, XLearner, \
     PropensityScore
 
@@ -80,6 +80,12 @@ class CausalModel:
         in the style stored in adjust (simple, minimal, or all).
     get_backdoor_path(treatment, outcome)
         Return all backdoor paths in the graph between treatment and outcome.
+    iter_backdoor_paths(treatment, outcome, max_length=None, only_open=False,
+                        conditioning=None)
+        Generate backdoor paths between treatment and outcome lazily.
+    classify_paths(paths, conditioning=None)
+        Return the colliders of every path and whether it is blocked given
+        conditioning.
     has_collider(path, backdoor_path=True)
         If the path in the current graph has a collider, return True, else
         return False.
@@ -94,7 +100,8 @@ class CausalModel:
         Estimation of hidden cofounders.
     """
 
-    def __init__(self, causal_graph=None, data=None, estimation=None):
+    def __init__(self, causal_graph=None, data=None, estimation=None,
+                 cache=None):
         """
         Parameters
         ----------
@@ -103,6 +110,11 @@ class CausalModel:
         estimation : tuple of 2 elements
             Describe estimation methods (the first element) and machine
             learning models (the second element) used for estimation.
+        cache : IdentificationCache or str, optional
+            If given, results of id(), get_backdoor_set() and
+            get_frontdoor_set(), including failures, are stored in this
+            cache or in an IdentificationCache at this path, keyed by the
+            fingerprint of the causal graph. Defaults to None.
         """
         self.data = data
         if estimation is None:
@@ -123,6 +135,36 @@ class CausalModel:
         self.causal_graph = causal_graph if causal_graph is not None\
             else self.discover_graph(data)
 
+        if cache is not None and not isinstance(cache, IdentificationCache):
+            cache = IdentificationCache(cache)
+        self.cache = cache
+
+    def _cached_identification(self, method, treatment, outcome, style,
+                               identify):
+        """Return identify(), or its stored result if self.cache has it.
+        IdentificationError is stored as well and raised again on later
+        calls.
+        """
+        if self.cache is None:
+            return identify()
+
+        key = self.cache.make_key(
+            self.causal_graph.fingerprint, method, treatment, outcome, style
+        )
+        stored = self.cache.get(key)
+        if stored is None:
+            try:
+                result = identify()
+            except IdentificationError as e:
+                self.cache.put(key, {'error': e.info})
+                raise
+            self.cache.put(key, {'result': encode(result)})
+            return result
+
+        if 'error' in stored:
+            raise IdentificationError(stored['error'])
+        return decode(stored['result'])
+
     def id(self, y, x, prob=None, graph=None):
         """Identify the causal quantity P(y|do(x)) if identifiable else return
         False. See Shpitser and Pearl (2006b)
@@ -154,66 +196,135 @@ class CausalModel:
         # TODO: need to be careful about the fact that set is not ordered,
         # be careful about the usage of list and set in the current
         # implementation
+        if graph is None and prob is None:
+            graph = self.causal_graph
+            return self._cached_identification(
+                'id', x, y, None,
+                lambda: self._id(y, x, graph.prob, graph)
+            )
+
         if graph is None:
             graph = self.causal_graph
 
         if prob is None:
             prob = graph.prob
 
+        return self._id(y, x, prob, graph)
+
+    def _id(self, y, x, prob, graph):
+        """The ID algorithm, see id(), run with an explicit stack of frames
+        instead of recursion.
+
+        Every subproblem is a task (y, x, prob, nodes) where nodes is the
+        set of nodes of its graph, which is always the subgraph of graph
+        induced by nodes. A frame holds the memo key of its task and, once
+        expanded, the keys of its subtasks and the function combining their
+        results. Results are stored in memo, keyed by y, x, nodes and the
+        canonical key of prob, and assembled bottom-up when a frame is
+        revisited after all of its subtasks. Prob objects are never mutated,
+        so results can be shared.
+        """
+        root = graph
+        root_nodes = frozenset(root.causation)
+
+        def frame(task):
+            y, x, prob, nodes = task
+            return [(y, x, nodes, prob.key()), task, None, None]
+
+        memo = {}
+        stack = [frame((frozenset(y), frozenset(x), prob, root_nodes))]
+        while stack:
+            key, task, subtasks, combine = stack[-1]
+            if key in memo:
+                stack.pop()
+            elif subtasks is None:
+                y, x, prob, nodes = task
+                graph = root if nodes == root_nodes \
+                    else root.build_sub_graph(nodes, view=True)
+                step = self._id_step(set(y), set(x), prob, graph)
+                if isinstance(step, Prob):
+                    memo[key] = step
+                    stack.pop()
+                    continue
+
+                subtasks, combine = step
+                frames = [frame(subtask) for subtask in subtasks]
+                stack[-1][2:] = [[f[0] for f in frames], combine]
+                stack.extend(reversed(frames))
+            else:
+                memo[key] = combine([memo[k] for k in subtasks])
+                stack.pop()
+
+        return memo[key]
+
+    def _id_step(self, y, x, prob, graph):
+        """Apply the first applicable line of the ID algorithm.
+
+        Returns
+        ----------
+        Prob or tuple
+            The result if the line finishes the subproblem, otherwise a list
+            of subtasks (y, x, prob, nodes) and a function building the
+            result from the list of their results.
+        """
         v = set(graph.causation.keys())
-        v_topo = list(graph.topo_order)
-        y, x = set(y), set(x)
+        nodes = frozenset(v)
+
+        def passed(results):
+            return results[0]
 
         # 1
         if not x:
             if prob.divisor or prob.product:
-                prob.marginal = v.difference(y).union(prob.marginal)
-            else:
-                # If the prob is not built with products, then
-                # simply replace the variables with y
-                prob.variables = y
-            return prob
+                return prob.copy(marginal=v.difference(y).union(prob.marginal))
+            # If the prob is not built with products, then
+            # simply replace the variables with y
+            return prob.copy(variables=y)
 
         # 2
         ancestor = graph.ancestors(y)
-        prob_ = deepcopy(prob)
         if v.difference(ancestor) != set():
-            an_graph = graph.build_sub_graph(ancestor)
-            if prob_.divisor or prob_.product:
-                prob_.marginal = v.difference(ancestor).union(prob_.marginal)
+            if prob.divisor or prob.product:
+                prob_ = prob.copy(
+                    marginal=v.difference(ancestor).union(prob.marginal)
+                )
             else:
-                prob_.variables = ancestor
-            return self.id(y, x.intersection(ancestor), prob_, an_graph)
+                prob_ = prob.copy(variables=ancestor)
+            return [(
+                frozenset(y), frozenset(x.intersection(ancestor)), prob_,
+                frozenset(ancestor.intersection(v))
+            )], passed
 
         # 3
         w = v.difference(x).difference(
             graph.remove_incoming_edges(x, new=True).ancestors(y)
         )
         if w:
-            return self.id(y, x.union(w), prob, graph)
+            return [
+                (frozenset(y), frozenset(x.union(w)), prob, nodes)
+            ], passed
 
         # 4
         c = list(graph.remove_nodes(x, new=True).c_components)
         if len(c) > 1:
-            product_expressioin = set()
-            for subset in c:
-                product_expressioin.add(
-                    self.id(subset, v.difference(subset), prob, graph)
-                )
-            return Prob(
-                marginal=v.difference(y.union(x)), product=product_expressioin
-            )
+            marginal = v.difference(y.union(x))
+            return [
+                (frozenset(subset), frozenset(v.difference(subset)), prob,
+                 nodes) for subset in c
+            ], lambda results: Prob(marginal=marginal, product=set(results))
         else:
             s = c.pop()
-            cg = list(graph.c_components)
+            # s is contained in a single C-component of the graph
+            component = graph.c_component_of(next(iter(s)))
+            v_topo = list(graph.topo_order)
             # 5
-            if cg[0] == set(graph.dag.nodes):
+            if len(component) == len(graph.causation):
                 raise IdentificationError(
                     'The causal quantity is not identifiable in the'
                     'current graph.'
                 )
             # 6
-            elif s in cg:
+            elif component == s:
                 product_expression = set()
                 for element in s:
                     product_expression.add(
@@ -228,21 +339,18 @@ class CausalModel:
             else:
                 # TODO: not clear whether directly replacing a random variable
                 # with one of its value matters in this line
-                for subset in cg:
-                    if s.intersection(subset) == s:
-                        product_expressioin = set()
-                        for element in subset:
-                            product_expressioin.add(
-                                Prob(variables={element},
-                                     conditional=set(v_topo[
-                                         :v_topo.index(element)
-                                     ]))
-                            )
-                        sub_prob = Prob(product=product_expressioin)
-                        sub_graph = graph.build_sub_graph(subset)
-                        return self.id(
-                            y, x.intersection(subset), sub_prob, sub_graph
-                        )
+                subset = set(component)
+                product_expressioin = set()
+                for element in subset:
+                    product_expressioin.add(
+                        Prob(variables={element},
+                             conditional=set(v_topo[:v_topo.index(element)]))
+                    )
+                sub_prob = Prob(product=product_expressioin)
+                return [(
+                    frozenset(y), frozenset(x.intersection(subset)), sub_prob,
+                    frozenset(subset)
+                )], passed
 
     def identify(self, treatment, outcome, identify_method=None):
         """Identify the causal effect expression.
@@ -346,10 +454,23 @@ class CausalModel:
         # TODO: now only supports estimation with adjustment set. This needs
         # to be updated if the estimation of general identification problem
         # is solved.
-        adjustment_set = self.identify(treatment, outcome, identify_method)[0]
+        if tuple(identify_method) == ('backdoor', 'all'):
+            # only the first set is used, so the others are not listed
+            adjustment_set = next(
+                self.iter_backdoor_sets(treatment, outcome), None
+            )
+            if adjustment_set is None:
+                raise IdentificationError(
+                    'No set can satisfy the backdoor criterion.'
+                )
+            adjustment_set = list(adjustment_set)
+        else:
+            adjustment_set = self.identify(
+                treatment, outcome, identify_method
+            )[0]
+            if identify_method[1] == 'all':
+                adjustment_set = list(adjustment_set[0])
         print(f'The corresponding adjustment set is {adjustment_set}')
-        if identify_method[1] == 'all':
-            adjustment_set = list(adjustment_set[0])
         return self.estimate(
             data, outcome, treatment, adjustment_set, quantity, condition_set,
             condition, individual
@@ -392,12 +513,42 @@ class CausalModel:
             else {treatment}
         outcome = set(outcome) if type(outcome) is not str else {outcome}
 
-        modified_dag = self.causal_graph.remove_outgoing_edges(
-            treatment, new=True
-        ).explicit_unob_var_dag
-        return nx.d_separated(modified_dag, treatment, outcome, set_)
+        return self.causal_graph.is_d_separated(
+            treatment, outcome, set_, cut_outgoing=treatment
+        )
+
+    def is_valid_backdoor_set_many(self, sets, treatment, outcome,
+                                   n_jobs=None):
+        """Determine for every set in sets if it is a valid backdoor
+        adjustment set for causal effect of treatments on the outcomes.
 
-    def get_backdoor_set(self, treatment, outcome, adjust='simple'):
+        Parameters
+        ----------
+        sets : list of set
+            The candidate adjustment sets.
+        treatment : set or list of str
+            str is also acceptable for single treatment.
+        outcome : set or list of str
+            str is also acceptable for single outcome.
+        n_jobs : int, optional
+            If larger than 1, large batches are split over a pool of n_jobs
+            processes. Defaults to None.
+
+        Returns
+        ----------
+        list of bool
+            One result for every set in sets, see is_valid_backdoor_set().
+        """
+        treatment = set(treatment) if type(treatment) is not str \
+            else {treatment}
+        outcome = set(outcome) if type(outcome) is not str else {outcome}
+
+        return self.causal_graph.is_d_separated_many(
+            treatment, outcome, sets, cut_outgoing=treatment, n_jobs=n_jobs
+        )
+
+    def get_backdoor_set(self, treatment, outcome, adjust='simple',
+                         cost=None):
         """Return the backdoor adjustment set for the given treatment and outcome.
 
         Parameters
@@ -409,14 +560,21 @@ class CausalModel:
         adjust : str
             Set style of the backdoor set
                 simple: directly return the parent set of treatment
-                minimal: return the minimal backdoor adjustment set
+                minimal: return a backdoor adjustment set none of whose
+                    proper subsets is valid, found in O(V + E)
+                minimum: return a backdoor adjustment set of minimum cost,
+                    found with a minimum cut in polynomial time
                 all: return all valid backdoor adjustment set.
+        cost : dict or callable, optional
+            Costs of nodes for the minimum style, see
+            SeparatorSearch.find_minimum(). Defaults to None, i.e., every
+            node costs 1.
 
         Raises
         ----------
         Exception : IdentificationError
-            Raise error if the style is not in simple, minimal or all or no
-            set can satisfy the backdoor criterion.
+            Raise error if the style is not in simple, minimal, minimum or
+            all or no set can satisfy the backdoor criterion.
 
         Returns
         ----------
@@ -424,27 +582,48 @@ class CausalModel:
             The first element is the adjustment list, the second is encoded
             Prob.
         """
-        # TODO: can I find the adjustment sets by using the adj matrix
-        # TODO: improve the implementation
-
         # convert treatment and outcome to sets.
         treatment = set(treatment) if type(treatment) is not str \
             else {treatment}
         outcome = set(outcome) if type(outcome) is not str else {outcome}
 
-        modified_dag = self.causal_graph.remove_outgoing_edges(
-            treatment, new=True
-        ).explicit_unob_var_dag
+        if cost is None:
+            backdoor_list, prob = self._cached_identification(
+                'backdoor', treatment, outcome, adjust,
+                lambda: self._get_backdoor_set(treatment, outcome, adjust)
+            )
+        else:
+            # costs are not part of the keys of the cache
+            backdoor_list, prob = self._get_backdoor_set(
+                treatment, outcome, adjust, cost
+            )
+
+        print(
+            f'The corresponding statistical estimand should be {prob.parse()})'
+        )
+        return (backdoor_list, prob)
+
+    def _get_backdoor_set(self, treatment, outcome, adjust, cost=None):
+        """Find the backdoor adjustment set, see get_backdoor_set(), where
+        treatment and outcome are sets.
+        """
+        # TODO: can I find the adjustment sets by using the adj matrix
+        # TODO: improve the implementation
+
+        # d-separation in the graph without outgoing edges of the treatment
+        def is_separated(test_set):
+            return self.causal_graph.is_d_separated(
+                treatment, outcome, test_set, cut_outgoing=treatment
+            )
 
-        def determine(modified_dag, treatment, outcome):
+        def determine(treatment, outcome):
             if all(
                 [self.causal_graph.causation[t] == [] for t in treatment]
             ):
-                return nx.d_separated(modified_dag, treatment,
-                                      outcome, set())
+                return is_separated(set())
             return True
 
-        if not determine(modified_dag, treatment, outcome):
+        if not determine(treatment, outcome):
             raise IdentificationError(
                 'No set can satisfy the backdoor criterion.'
             )
@@ -456,51 +635,44 @@ class CausalModel:
                 backdoor_list += self.causal_graph.causation[t]
             adset = set(backdoor_list)
         else:
-            # Get all backdoor sets. currently implenmented
-            # in a brutal force manner. NEED IMPROVEMENT
-            des_set, backdoor_set_list = set(), []
-            for t in treatment:
-                des_set.update(
-                    nx.descendants(self.causal_graph.observed_dag, t)
-                )
+            des_set = self.causal_graph.descendants(treatment)
             initial_set = (
                 set(list(self.causal_graph.causation.keys())) -
                 treatment - outcome - des_set
             )
 
-            if adjust == 'minimal':
-                for i in powerset(initial_set):
-                    if nx.d_separated(modified_dag, treatment, outcome, i):
-                        backdoor_set_list.append(i)
-                        break
-            else:
-                backdoor_set_list = [
-                    i for i in powerset(initial_set)
-                    if nx.d_separated(modified_dag, treatment, outcome, i)
-                ]
-
-            if not backdoor_set_list and not nx.d_separated(
-                modified_dag, treatment, outcome, set()
-            ):
-                raise IdentificationError(
-                    'No set can satisfy the backdoor criterion.'
+            if adjust in ('minimal', 'minimum'):
+                # constructive search in the graph without outgoing edges of
+                # the treatment, see SeparatorSearch
+                separators = self.causal_graph.separators
+                if adjust == 'minimal':
+                    adset = separators.find_minimal(
+                        treatment, outcome, restrict=initial_set,
+                        cut_outgoing=treatment
+                    )
+                else:
+                    adset = separators.find_minimum(
+                        treatment, outcome, restrict=initial_set,
+                        cut_outgoing=treatment, cost=cost
+                    )
+                if adset is None:
+                    raise IdentificationError(
+                        'No set can satisfy the backdoor criterion.'
+                    )
+                backdoor_list = adset
+            elif adjust == 'all':
+                backdoor_list = list(
+                    self.iter_backdoor_sets(treatment, outcome)
                 )
-
-            try:
-                backdoor_set_list[0]
-            except Exception:
-                backdoor_set_list = [[]]
-            finally:
-                adset = set(backdoor_set_list[0])
-
-            if adjust == 'all':
-                backdoor_list = backdoor_set_list
-            elif adjust == 'minimal':
-                backdoor_list = backdoor_set_list[0]
+                if not backdoor_list:
+                    raise IdentificationError(
+                        'No set can satisfy the backdoor criterion.'
+                    )
+                adset = backdoor_list[0]
             else:
                 raise IdentificationError(
-                    'Do not support backdoor set styles other than simple, all'
-                    'or minimal.'
+                    'Do not support backdoor set styles other than simple, '
+                    'minimal, minimum or all.'
                 )
 
         # Build the corresponding probability distribution.
@@ -510,11 +682,43 @@ class CausalModel:
             Prob(variables=adset)
         }
         prob = Prob(marginal=adset, product=product_expression)
+        return (backdoor_list, prob)
 
-        print(
-            f'The corresponding statistical estimand should be {prob.parse()})'
+    def iter_backdoor_sets(self, treatment, outcome, limit=None, cost=None):
+        """Generate all valid backdoor adjustment sets for the given
+        treatment and outcome with polynomial delay, see
+        SeparatorSearch.iter_separators(). Sets are generated on demand so
+        that the first ones can be used without listing the others.
+
+        Parameters
+        ----------
+        treatment : set or list of str
+            Names of the treatment. str is also acceptable for single treatment.
+        outcome : set or list of str
+            Names of the outcome. str is also acceptable for single outcome.
+        limit : int, optional
+            Maximal number of generated sets. Defaults to None, i.e., all.
+        cost : dict or callable, optional
+            If given, generate sets in the increasing order of their total
+            costs of nodes, see SeparatorSearch.find_minimum(). Defaults to
+            None, where the first set is a minimal one.
+
+        Returns
+        ----------
+        generator of set of str
+        """
+        treatment = set(treatment) if type(treatment) is not str \
+            else {treatment}
+        outcome = set(outcome) if type(outcome) is not str else {outcome}
+        initial_set = (
+            set(self.causal_graph.causation.keys()) - treatment - outcome -
+            self.causal_graph.descendants(treatment)
         )
-        return (backdoor_list, prob)
+        sets = self.causal_graph.separators.iter_separators(
+            treatment, outcome, restrict=initial_set, cut_outgoing=treatment,
+            cost=cost
+        )
+        return islice(sets, limit)
 
     def get_backdoor_path(self, treatment, outcome):
         """Return all backdoor path connecting treatment and outcome.
@@ -530,13 +734,55 @@ class CausalModel:
             A list containing all valid backdoor paths between the treatment and
             outcome in the graph.
         """
-        dag = self.causal_graph.explicit_unob_var_dag
-        return [
-            p for p in nx.all_simple_paths(
-                dag.to_undirected(), treatment, outcome
-            )
-            if len(p) > 2 and p[1] in dag.predecessors(treatment)
-        ]
+        return list(self.iter_backdoor_paths(treatment, outcome))
+
+    def iter_backdoor_paths(self, treatment, outcome, max_length=None,
+                            only_open=False, conditioning=None):
+        """Generate backdoor paths connecting treatment and outcome in
+        explicit_unob_var_dag one by one, so that the search stops as soon as
+        the caller stops, e.g., after the first open path.
+
+        Parameters
+        ----------
+        treatment : str
+        outcome : str
+        max_length : int, optional
+            Maximal number of edges of the paths, where a latent confounding
+            arc counts as two edges. Defaults to None, i.e., no limit.
+        only_open : bool, optional
+            If True, only generate paths d-connected given conditioning,
+            where blocked paths are pruned as soon as a blocked node is met.
+            Defaults to False.
+        conditioning : set of str, optional
+            The conditioning set when only_open is True. Defaults to None,
+            i.e., the empty set.
+
+        Returns
+        ----------
+        generator of list of str
+        """
+        return self.causal_graph.paths.iter_paths(
+            treatment, outcome, backdoor=True, max_length=max_length,
+            conditioning=set(conditioning or ()) if only_open else None
+        )
+
+    def classify_paths(self, paths, conditioning=None):
+        """Return the positions of the colliders of every path and whether it
+        is blocked given conditioning, see PathAnalysis.classify().
+
+        Parameters
+        ----------
+        paths : list of list of str
+            Paths of explicit_unob_var_dag.
+        conditioning : set of str, optional
+            Defaults to None, i.e., the empty set.
+
+        Returns
+        ----------
+        list of tuple
+            (colliders, blocked) for every path.
+        """
+        return self.causal_graph.paths.classify(paths, conditioning)
 
     def has_collider(self, path, backdoor_path=True):
         """If the path in the current graph has a collider, return True, else
@@ -546,43 +792,20 @@ class CausalModel:
         ----------
         path : list of str
             A list containing nodes in the path.
-        graph : nx.DiGraph, optional
+        backdoor_path : bool, optional
+            Kept for compatibility. Colliders are the inner nodes whose both
+            edges on the path point to them, whatever the first edge is.
 
         Returns
         ----------
         Boolean
             True if the path has a collider.
         """
-        # TODO: improve the implementation.
-        if path[1] not in self.causal_graph.causation[path[0]]:
-            backdoor_path = False
-
-        if len(path) > 2:
-            dag = self.causal_graph.explicit_unob_var_dag
-
-            assert(nx.is_path(dag.to_undirected(), path)), "Not a valid path."
-
-            j = 0
-            if backdoor_path:
-                if len(path) == 3:
-                    return False
-
-                for i, node in enumerate(path[1:], 1):
-                    if node in dag.successors(path[i-1]):
-                        # if path[i] is the last element, then it is impossible
-                        # to have collider
-                        if i == len(path) - 1:
-                            return False
-                        j = i
-                        break
-                for i, node in enumerate(path[j+1:], j+1):
-                    if node in dag.predecessors(path[i-1]):
-                        return True
-            else:
-                for i, node in enumerate(path[1:], 1):
-                    if node in dag.predecessors(path[i-1]):
-                        return True
-        return False
+        try:
+            colliders, _ = self.classify_paths([path])[0]
+        except ValueError:
+            raise AssertionError('Not a valid path.')
+        return bool(colliders)
 
     def is_connected_backdoor_path(self, path):
         """Test whether a backdoor path is connected.
@@ -597,17 +820,15 @@ class CausalModel:
         Boolean
             True if path is a d-connected backdoor path and False otherwise.
         """
-        assert path[1] in \
-            self.causal_graph.explicit_unob_var_dag.predecessors(path[0]),\
-            'Not a backdoor path.'
+        paths = self.causal_graph.paths
+        assert path[1] in paths.parents[path[0]], 'Not a backdoor path.'
 
-        # A backdoor path is not connected if it contains a collider or not a
-        # backdoor_path.
-        # TODO: improve the implementation
-        if self.has_collider(path) or \
-                path not in self.get_backdoor_path(path[0], path[-1]):
+        # A backdoor path is not connected if it is blocked by the empty set,
+        # i.e., it contains a collider, or it is not a backdoor_path.
+        if not paths.is_backdoor_path(path):
             return False
-        return True
+        _, blocked = paths.classify([path])[0]
+        return not blocked
 
     def is_frontdoor_set(self, set_, treatment, outcome):
         """True is the given set is a valid frontdoor adjustment set.
@@ -624,22 +845,13 @@ class CausalModel:
             True if the given set is a valid frontdoor adjustment set for
             corresponding treatemtns and outcomes.
         """
-        # rule 1, intercept all directed paths from treatment to outcome
-        for path in nx.all_simple_paths(
-            self.causal_graph.observed_dag, treatment, outcome
-        ):
-            if not any([path_node in set_ for path_node in path]):
-                return False
-
-        # rule 2, there is no unblocked back-door path from treatment to set_
-        for subset in set_:
-            for path in self.get_backdoor_path(treatment, subset):
-                if self.is_connected_backdoor_path(path):
-                    return False
-
+        # rule 1, intercept all directed paths from treatment to outcome,
+        # rule 2, there is no unblocked back-door path from treatment to set_,
         # rule 3, all backdoor paths from set_ to outcome are blocked by
         # treatment
-        return self.is_valid_backdoor_set({treatment}, set_, {outcome})
+        return self.causal_graph.frontdoor_sets.is_frontdoor_set(
+            set_, {treatment}, {outcome}
+        )
 
     def get_frontdoor_set(self, treatment, outcome, adjust='simple'):
         """Return the frontdoor set for adjusting the causal effect between
@@ -664,30 +876,24 @@ class CausalModel:
             'element for frontdoor adjustment.'
             treatment, outcome = treatment.pop(), outcome.pop()
 
-        # Find the initial set which will then be used to generate all
-        # possible frontdoor sets with the method powerset()
-        initial_set = set()
-        for path in nx.all_simple_paths(
-            self.causal_graph.observed_dag, treatment, outcome
-        ):
-            initial_set.update(set(path))
-        initial_set = initial_set - {treatment} - {outcome}
-        potential_set = powerset(initial_set)
-
-        # Different frontdoor set styles.
+        return self._cached_identification(
+            'frontdoor', {treatment}, {outcome}, adjust,
+            lambda: self._get_frontdoor_set(treatment, outcome, adjust)
+        )
+
+    def _get_frontdoor_set(self, treatment, outcome, adjust):
+        """Find the frontdoor set, see get_frontdoor_set(), where treatment
+        and outcome are str.
+        """
+        # Different frontdoor set styles. The candidates are the nodes on
+        # directed paths from treatment to outcome, see FrontdoorSearch.
         if adjust == 'simple' or adjust == 'minimal':
-            adjustment, adset = set(), set()
-            for set_ in potential_set:
-                if self.is_frontdoor_set(set_, treatment, outcome):
-                    adjustment.update(set_)
-                    adset.update(set_)
-                    break
+            adjustment = self.causal_graph.frontdoor_sets.find_minimal(
+                {treatment}, {outcome}
+            ) or set()
+            adset = set(adjustment)
         elif adjust == 'all':
-            adjustment = [
-                i for i in powerset(initial_set) if self.is_frontdoor_set(
-                    i, treatment, outcome
-                )
-            ]
+            adjustment = list(self.iter_frontdoor_sets(treatment, outcome))
             adset = adjustment[0] if adjustment else set()
         else:
             raise IdentificationError(
@@ -714,6 +920,26 @@ class CausalModel:
         prob = Prob(marginal=adset, product=product_expression)
         return (adjustment, prob)
 
+    def iter_frontdoor_sets(self, treatment, outcome, limit=None):
+        """Generate all frontdoor adjustment sets for the given treatment and
+        outcome with polynomial delay, see FrontdoorSearch.iter_sets().
+
+        Parameters
+        ----------
+        treatment : str
+        outcome : str
+        limit : int, optional
+            Maximal number of generated sets. Defaults to None, i.e., all.
+
+        Returns
+        ----------
+        generator of set of str
+        """
+        sets = self.causal_graph.frontdoor_sets.iter_sets(
+            {treatment}, {outcome}
+        )
+        return islice(sets, limit)
+
     def estimate_hidden_cofounder(self, method='lr'):
 
         def check_ancestors_chain(dag, node, U):
@@ -0,0 +1,160 @@
+import networkx as nx
+
+from causal_model.graph_core import CowMap
+
+
+class CycleError(nx.NetworkXUnfeasible):
+    """
+    Raised when an edge would close a directed cycle.
+
+    Attributes
+    ----------
+    info : str
+    cycle : list of tuple
+        Edges (u, v) of the cycle, starting with the rejected edge.
+    """
+
+    def __init__(self, info, cycle):
+        super().__init__(info)
+        self.info = info
+        self.cycle = cycle
+
+    def __str__(self):
+        return self.info
+
+
+class TopologicalOrder:
+    """
+    Topological order of the observed part of a causal graph maintained
+    under edge insertions with the algorithm of Pearce and Kelly (2006).
+
+    Every node has a distinct integer position, and every edge goes from a
+    smaller position to a larger one. Inserting an edge s -> t with
+    position[t] < position[s] only searches the nodes whose positions lie
+    between them: the descendants of t reordered after the ancestors of s,
+    within the positions they occupied before. If the search from t
+    reaches s, the edge closes a cycle and is rejected. Removing nodes or
+    edges keeps the order valid. Positions are stored in a CowMap, so
+    forking costs O(1).
+
+    Methods
+    ----------
+    add_node(node)
+        Place node after all other nodes.
+    remove_node(node)
+        Remove node from the order.
+    add_edge(s, t, parents, children)
+        Update the order for a new edge s -> t.
+    order()
+        Return the nodes sorted by their positions.
+    fork()
+        Return a new TopologicalOrder sharing the positions with this one.
+    """
+
+    def __init__(self, nodes=(), position=None, size=0):
+        """
+        Parameters
+        ----------
+        nodes : iterable, optional
+            Nodes in an initial topological order. Defaults to ().
+        position : CowMap, optional
+            Shared positions of the nodes. Defaults to None.
+        size : int, optional
+            The first unused position. Defaults to 0.
+        """
+        self._position = CowMap(None) if position is None else position
+        self._next = size
+        for node in nodes:
+            self.add_node(node)
+
+    def __contains__(self, node):
+        return node in self._position
+
+    def add_node(self, node):
+        if node not in self._position:
+            self._position[node] = self._next
+            self._next += 1
+
+    def remove_node(self, node):
+        if node in self._position:
+            del self._position[node]
+
+    def add_edge(self, s, t, parents, children):
+        """Update the order for a new edge s -> t, which must be called
+        before the edge is added to parents and children.
+
+        Parameters
+        ----------
+        s : str
+        t : str
+        parents : Mapping
+            Parents of every node.
+        children : Mapping
+            Children of every node.
+
+        Raises
+        ----------
+        CycleError
+            If the edge closes a directed cycle, in which case the order is
+            not changed.
+        """
+        if s == t:
+            raise CycleError(f'The edge {s}-{t} is a self-loop.', [(s, t)])
+
+        position = self._position
+        lower, upper = position[t], position[s]
+        if upper < lower:
+            return
+
+        # descendants of t placed before s
+        forward, previous, stack = {t}, {}, [t]
+        while stack:
+            node = stack.pop()
+            for child in children.get(node, ()):
+                if child == s:
+                    path = [node]
+                    while path[-1] != t:
+                        path.append(previous[path[-1]])
+                    cycle = [s] + path[::-1] + [s]
+                    raise CycleError(
+                        f'The edge {s}-{t} closes a directed cycle.',
+                        list(zip(cycle[:-1], cycle[1:]))
+                    )
+                if child not in forward and position[child] < upper:
+                    forward.add(child)
+                    previous[child] = node
+                    stack.append(child)
+
+        # ancestors of s placed after t
+        backward, stack = {s}, [s]
+        while stack:
+            for parent in parents.get(stack.pop(), ()):
+                if parent not in backward and position[parent] > lower:
+                    backward.add(parent)
+                    stack.append(parent)
+
+        key = position.__getitem__
+        moved = sorted(backward, key=key) + sorted(forward, key=key)
+        slots = sorted(position[node] for node in moved)
+        for node, slot in zip(moved, slots):
+            position[node] = slot
+
+    def order(self):
+        """Return the nodes sorted by their positions.
+
+        Returns
+        ----------
+        list
+        """
+        return sorted(self._position, key=self._position.__getitem__)
+
+    def fork(self):
+        """Return a new TopologicalOrder sharing the positions with this one.
+
+        Returns
+        ----------
+        TopologicalOrder
+        """
+        return TopologicalOrder(
+            position=self._position.fork(), size=self._next
+        )
@@ -1,3 +1,3 @@
 from . import do_operator
 from . import gradient_based
-from . import instrumental_variables
\ No newline at end of file
+#from . import instrumental_variables
\ No newline at end of file
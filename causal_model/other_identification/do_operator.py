@@ -1,5 +1,3 @@
-
-
 class Do:
     """Implementation of the do-operator.
 
@@ -10,6 +8,8 @@ class Do:
 
     Methods
     ----------
+    do(treatment, value=None)
+        Return the graph where the treatment is set by the do-operator.
     """
 
     def __init__(self, causation):
@@ -21,35 +21,259 @@ class Do:
         """
         self.causation = causation
 
-    def do(self, treatment, value):
-        """Do the treatment=value in the graph or structural models.
+    def do(self, treatment, value=None):
+        """Do the treatment=value in the graph or structural models. The
+        causation is left unchanged.
 
         Parameters
         ----------
-        treatment : str
+        treatment : str or set of str
         value : float, optional
             the value of the treatment
+
+        Returns
+        ----------
+        CausalGraph
+            The graph without all incoming edges of the treatment.
         """
-        self.causation.remove_incoming_edges(treatment)
-        # TODO
+        if isinstance(treatment, str):
+            treatment = {treatment}
+        self.treatment = treatment
+        return self.causation.remove_incoming_edges(treatment, new=True)
+        # TODO: set the value in structural models
 
-    # def remove_incoming_edges(self, node):
-    #     """remove the incoming edges to node
 
-    #     Parameters
-    #     ----------
-    #     node : str
-    #     """
-    #     pass
+class DoCalculus:
+    r"""
+    The three rules of do-calculus (Pearl, 2009, Theorem 3.4.1) applied to
+    Prob expressions of a causal graph. Below, G_{\bar X} is the graph
+    without the incoming edges of X and G_{\bar X \underline Z} is the graph
+    further without the outgoing edges of Z.
 
+    Every graph G_{\bar X} is built once per X and cached until the causal
+    graph is modified. Removing outgoing edges is done by the d-separation
+    test itself, so G_{\bar X \underline Z} shares the cached G_{\bar X}.
 
-class DoCalculus:
-    # TODO: Rules of do-calculus are implemented as follows
-    def rule_one(self):
-        pass
+    Attributes
+    ----------
+    graph : CausalGraph
+
+    Methods
+    ----------
+    mutilated(bar)
+        Return the graph without the incoming edges of bar.
+    rule_one(y, x, z, w=None)
+        Check if P(y|do(x), z, w) = P(y|do(x), w).
+    rule_two(y, x, z, w=None)
+        Check if P(y|do(x), do(z), w) = P(y|do(x), z, w).
+    rule_three(y, x, z, w=None)
+        Check if P(y|do(x), do(z), w) = P(y|do(x), w).
+    apply_rule_one(prob, z)
+        Remove the observations z from prob.
+    apply_rule_two(prob, z)
+        Replace the actions do(z) of prob by observations.
+    apply_rule_three(prob, z)
+        Remove the actions do(z) from prob.
+    """
+
+    def __init__(self, graph):
+        """
+        Parameters
+        ----------
+        graph : CausalGraph
+        """
+        self.graph = graph
+        self._mutilated = {}
+        self._version = graph.version
+
+    def mutilated(self, bar):
+        """Return the graph without the incoming edges of all nodes in bar,
+        i.e., G_{\\bar X} for bar = X.
+
+        Parameters
+        ----------
+        bar : set of str
+
+        Returns
+        ----------
+        CausalGraph
+            Cached graph which should not be modified.
+        """
+        if self._version != self.graph.version:
+            self._mutilated.clear()
+            self._version = self.graph.version
+        bar = frozenset(bar)
+        try:
+            return self._mutilated[bar]
+        except KeyError:
+            pass
+        if bar:
+            graph = self.graph.remove_incoming_edges(bar, new=True)
+        else:
+            graph = self.graph
+        self._mutilated[bar] = graph
+        return graph
+
+    def _separated(self, y, z, given, bar, under=()):
+        y, z = set(y), set(z)
+        if not y or not z:
+            return True
+        return self.mutilated(bar).is_d_separated(
+            y, z, set(given), cut_outgoing=set(under)
+        )
+
+    def rule_one(self, y, x, z, w=None):
+        """Rule 1 (insertion/deletion of observations):
+        P(y|do(x), z, w) = P(y|do(x), w) if (Y ⊥ Z | X, W) in G_{\\bar X}.
+
+        Parameters
+        ----------
+        y : set of str
+        x : set of str
+        z : set of str
+        w : set of str, optional
+            Defaults to None, i.e., the empty set.
+
+        Returns
+        ----------
+        bool
+        """
+        given = set(x) | set(w or ())
+        return self._separated(y, z, given, x)
+
+    def rule_two(self, y, x, z, w=None):
+        """Rule 2 (action/observation exchange):
+        P(y|do(x), do(z), w) = P(y|do(x), z, w) if (Y ⊥ Z | X, W) in
+        G_{\\bar X \\underline Z}.
+
+        Parameters
+        ----------
+        y : set of str
+        x : set of str
+        z : set of str
+        w : set of str, optional
+            Defaults to None, i.e., the empty set.
 
-    def rule_two(self):
-        pass
+        Returns
+        ----------
+        bool
+        """
+        given = set(x) | set(w or ())
+        return self._separated(y, z, given, x, under=z)
+
+    def rule_three(self, y, x, z, w=None):
+        """Rule 3 (insertion/deletion of actions):
+        P(y|do(x), do(z), w) = P(y|do(x), w) if (Y ⊥ Z | X, W) in
+        G_{\\bar X \\bar{Z(W)}}, where Z(W) is the set of nodes of Z that are
+        not ancestors of any node of W in G_{\\bar X}.
+
+        Parameters
+        ----------
+        y : set of str
+        x : set of str
+        z : set of str
+        w : set of str, optional
+            Defaults to None, i.e., the empty set.
+
+        Returns
+        ----------
+        bool
+        """
+        w = set(w or ())
+        z = set(z)
+        if w:
+            z_w = z - self.mutilated(x).ancestors(w)
+        else:
+            z_w = z
+        return self._separated(y, z, set(x) | w, set(x) | z_w)
+
+    @staticmethod
+    def _check(prob, z, attribute):
+        if prob.product or prob.marginal or prob.divisor:
+            raise ValueError(
+                'Rules of do-calculus only apply to a single conditional '
+                'probability.'
+            )
+        z = set(z)
+        if not z <= getattr(prob, attribute):
+            raise ValueError(
+                f'{z} is not in the {attribute} set of the probability.'
+            )
+        return z
+
+    def apply_rule_one(self, prob, z):
+        """Return prob without the observations z by rule 1, i.e.,
+        P(y|do(x), w) for prob = P(y|do(x), z, w).
+
+        Parameters
+        ----------
+        prob : Prob
+        z : set of str
+            Subset of prob.conditional.
+
+        Returns
+        ----------
+        Prob
+
+        Raises
+        ----------
+        ValueError
+            If rule 1 does not apply.
+        """
+        z = self._check(prob, z, 'conditional')
+        w = prob.conditional - z
+        if not self.rule_one(prob.variables, prob.do, z, w):
+            raise ValueError(f'Rule 1 does not remove {z} from the '
+                             'probability.')
+        return prob.copy(conditional=w)
+
+    def apply_rule_two(self, prob, z):
+        """Return prob where the actions do(z) become observations z by
+        rule 2, i.e., P(y|do(x), z, w) for prob = P(y|do(x), do(z), w).
+
+        Parameters
+        ----------
+        prob : Prob
+        z : set of str
+            Subset of prob.do.
+
+        Returns
+        ----------
+        Prob
+
+        Raises
+        ----------
+        ValueError
+            If rule 2 does not apply.
+        """
+        z = self._check(prob, z, 'do')
+        x = prob.do - z
+        if not self.rule_two(prob.variables, x, z, prob.conditional):
+            raise ValueError(f'Rule 2 does not exchange do({z}) for {z}.')
+        return prob.copy(conditional=prob.conditional | z, do=x)
+
+    def apply_rule_three(self, prob, z):
+        """Return prob without the actions do(z) by rule 3, i.e.,
+        P(y|do(x), w) for prob = P(y|do(x), do(z), w).
+
+        Parameters
+        ----------
+        prob : Prob
+        z : set of str
+            Subset of prob.do.
 
-    def rule_three(self):
-        pass
+        Returns
+        ----------
+        Prob
+
+        Raises
+        ----------
+        ValueError
+            If rule 3 does not apply.
+        """
+        z = self._check(prob, z, 'do')
+        x = prob.do - z
+        if not self.rule_three(prob.variables, x, z, prob.conditional):
+            raise ValueError(f'Rule 3 does not remove do({z}) from the '
+                             'probability.')
+        return prob.copy(do=x)
@@ -0,0 +1,191 @@
+import networkx as nx
+
+
+class PathAnalysis:
+    """
+    Paths of a causal graph where latent confounding arcs are replaced by
+    explicit unobserved variables, i.e., paths of explicit_unob_var_dag.
+
+    Parents and children of every node are stored as frozensets so that
+    the direction of every edge of a path is found in O(1).
+
+    Attributes
+    ----------
+    parents : dict
+        Map from every node to the frozenset of its parents.
+    children : dict
+        Map from every node to the frozenset of its children.
+    adjacent : dict
+        Map from every node to the tuple of its parents and children, in
+        the order of the graph.
+
+    Methods
+    ----------
+    iter_paths(source, target, backdoor=False, max_length=None,
+               conditioning=None)
+        Generate simple paths between source and target.
+    is_backdoor_path(path)
+        Check if path is a backdoor path.
+    classify(paths, conditioning=None)
+        Return the colliders of every path and whether it is blocked.
+    """
+
+    def __init__(self, dag):
+        """
+        Parameters
+        ----------
+        dag : nx.MultiDiGraph
+            The graph with explicit unobserved variables.
+        """
+        self.parents = {node: frozenset(dag.pred[node]) for node in dag}
+        self.children = {node: frozenset(dag.succ[node]) for node in dag}
+        self.adjacent = {
+            node: tuple(dag.pred[node]) + tuple(dag.succ[node])
+            for node in dag
+        }
+
+    def _ancestors(self, nodes):
+        reached = set(nodes)
+        stack = list(reached)
+        while stack:
+            for parent in self.parents[stack.pop()]:
+                if parent not in reached:
+                    reached.add(parent)
+                    stack.append(parent)
+        return reached
+
+    def iter_paths(self, source, target, backdoor=False, max_length=None,
+                   conditioning=None):
+        """Generate simple paths between source and target, ignoring the
+        directions of edges, with a depth-first search that keeps only the
+        current path.
+
+        Parameters
+        ----------
+        source : str
+        target : str
+        backdoor : bool, optional
+            If True, only generate backdoor paths, i.e., paths with at least
+            two edges whose first edge points to source. Defaults to False.
+        max_length : int, optional
+            Maximal number of edges of the paths, where a latent confounding
+            arc counts as two edges. Defaults to None, i.e., no limit.
+        conditioning : set of str, optional
+            If given, only generate paths d-connected given conditioning,
+            and extend no path beyond a blocked node. Defaults to None.
+
+        Returns
+        ----------
+        generator of list of str
+        """
+        if source not in self.parents or target not in self.parents:
+            raise nx.NodeNotFound(
+                'The source and the target must be in the graph.'
+            )
+        if conditioning is not None:
+            conditioning = set(conditioning)
+            an_conditioning = self._ancestors(conditioning)
+
+        path, on_path = [source], {source}
+        first = self.adjacent[source]
+        if backdoor:
+            first = (node for node in first if node in self.parents[source])
+        stack = [iter(first)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if node in on_path or (
+                max_length is not None and len(path) > max_length
+            ):
+                continue
+            if conditioning is not None and len(path) > 1:
+                # the last node of the path is now an inner node
+                last = path[-1]
+                parents = self.parents[last]
+                if path[-2] in parents and node in parents:
+                    if last not in an_conditioning:
+                        continue
+                elif last in conditioning:
+                    continue
+            if node == target:
+                if not backdoor or len(path) > 1:
+                    yield path + [node]
+                continue
+            path.append(node)
+            on_path.add(node)
+            stack.append(iter(self.adjacent[node]))
+
+    def is_backdoor_path(self, path):
+        """Check if path is a backdoor path, i.e., a simple path with at least
+        two edges whose first edge points to path[0].
+
+        Parameters
+        ----------
+        path : list of str
+
+        Returns
+        ----------
+        bool
+        """
+        if len(path) < 3 or len(set(path)) != len(path):
+            return False
+        if path[1] not in self.parents.get(path[0], ()):
+            return False
+        return all(
+            b in self.parents.get(a, ()) or b in self.children.get(a, ())
+            for a, b in zip(path, path[1:])
+        )
+
+    def classify(self, paths, conditioning=None):
+        """Return the positions of the colliders of every path and whether the
+        path is blocked given conditioning. The ancestors of conditioning,
+        i.e., the nodes with a descendant in it, are found once for all
+        paths, so that every path takes O(length).
+
+        Parameters
+        ----------
+        paths : list of list of str
+        conditioning : set of str, optional
+            Defaults to None, i.e., the empty set.
+
+        Returns
+        ----------
+        list of tuple
+            (colliders, blocked) for every path, where colliders is the list
+            of positions of inner nodes whose both edges on the path point
+            to them, and blocked is True if a collider is not an ancestor of
+            conditioning or another inner node is in conditioning.
+
+        Raises
+        ----------
+        ValueError
+            If two consecutive nodes of a path are not adjacent.
+        """
+        conditioning = set(conditioning or ())
+        an_conditioning = self._ancestors(conditioning)
+        results = []
+        for path in paths:
+            # into[i] is True if the edge between path[i - 1] and path[i]
+            # points to path[i]
+            into = [False]
+            for a, b in zip(path, path[1:]):
+                if a in self.parents.get(b, ()):
+                    into.append(True)
+                elif b in self.parents.get(a, ()):
+                    into.append(False)
+                else:
+                    raise ValueError(f'{path} is not a valid path.')
+
+            colliders, blocked = [], False
+            for i in range(1, len(path) - 1):
+                if into[i] and not into[i + 1]:
+                    colliders.append(i)
+                    if path[i] not in an_conditioning:
+                        blocked = True
+                elif path[i] in conditioning:
+                    blocked = True
+            results.append((colliders, blocked))
+        return results
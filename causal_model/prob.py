@@ -1,5 +1,7 @@
 from IPython.display import Latex
 
+from collections import Counter
+
 
 class Prob:
     r"""
@@ -23,6 +25,8 @@ class Prob:
         object (P(v|y)) and several other probabiity objects that are all saved
         in the set product, e.g., product = {P1, P2, P3} where P1 for P(w|z),
         P2 for P(x|y), and P3 for P(u) in the above example.
+    do : set
+        The intervened variables, e.g., x for P(v|do(x), y).
 
     Methods
     ----------
@@ -30,6 +34,14 @@ class Prob:
         Return the expression of the probability distribution.
     show_latex_expression()
         Show the latex expression.
+    copy(**changes)
+        Return a new Prob with some attributes replaced.
+    key()
+        Return a hashable canonical representation of the probability.
+    to_dict()
+        Return a JSON-serializable representation of the probability.
+    from_dict(data)
+        Build the probability from the output of to_dict().
     """
 
     def __init__(self,
@@ -37,7 +49,8 @@ class Prob:
                  conditional=set(),
                  divisor=set(),
                  marginal=set(),
-                 product=set()):
+                 product=set(),
+                 do=set()):
         """
         Parameters
         ----------
@@ -48,12 +61,95 @@ class Prob:
             marginal distribution
         product : set
             set of Prob
+        do : set
+            elements are strings, the variables set by the do-operator
         """
         self.divisor = divisor
         self.variables = variables
         self.conditional = conditional
         self.marginal = marginal
         self.product = product
+        self.do = do
+
+    def copy(self, **changes):
+        """Return a new Prob with the same attributes except those given in
+        changes. The attributes are shared rather than copied, so Prob
+        objects should be treated as immutable.
+
+        Parameters
+        ----------
+        changes : dict
+            Keys are names of the parameters of Prob.
+
+        Returns
+        ----------
+        Prob
+        """
+        attributes = {
+            'variables': self.variables,
+            'conditional': self.conditional,
+            'divisor': self.divisor,
+            'marginal': self.marginal,
+            'product': self.product,
+            'do': self.do,
+        }
+        attributes.update(changes)
+        return Prob(**attributes)
+
+    def key(self):
+        """Return a hashable canonical representation of the probability,
+        where equal keys mean equal expressions up to the order of sets.
+
+        Returns
+        ----------
+        tuple
+        """
+        return (
+            frozenset(self.variables), frozenset(self.conditional),
+            frozenset(self.divisor), frozenset(self.marginal),
+            frozenset(Counter(p.key() for p in self.product).items()),
+            frozenset(self.do)
+        )
+
+    def to_dict(self):
+        """Return a JSON-serializable representation of the probability,
+        where sets are sorted lists so that equal keys give equal outputs.
+
+        Returns
+        ----------
+        dict
+        """
+        return {
+            'variables': sorted(self.variables, key=str),
+            'conditional': sorted(self.conditional, key=str),
+            'divisor': sorted(self.divisor, key=str),
+            'marginal': sorted(self.marginal, key=str),
+            'product': sorted(
+                (p.to_dict() for p in self.product), key=repr
+            ),
+            'do': sorted(self.do, key=str),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build the probability from the output of to_dict().
+
+        Parameters
+        ----------
+        data : dict
+
+        Returns
+        ----------
+        Prob
+        """
+        return cls(
+            variables=set(data['variables']),
+            conditional=set(data['conditional']),
+            divisor=set(data['divisor']),
+            marginal=set(data['marginal']),
+            product={cls.from_dict(p) for p in data['product']},
+            do=set(data.get('do', ())),
+        )
 
     def parse(self):
         """
@@ -75,9 +171,12 @@ class Prob:
         if self.variables:
             var = ', '
             var = var.join(self.variables)
-            if self.conditional:
+            if self.conditional or self.do:
                 cond = ', '
                 cond = cond.join(self.conditional)
+                if self.do:
+                    do = ', '.join(self.do)
+                    cond = f'do({do}), {cond}' if cond else f'do({do})'
                 expression = expression + f'P({var}|{cond})'
             else:
                 expression += f'P({var})'
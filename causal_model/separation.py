@@ -0,0 +1,281 @@
+import networkx as nx
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+# Number of ancestor sets of conditioning sets kept by DSeparation.
+ANCESTOR_CACHE_SIZE = 256
+
+# Batches smaller than this are never split over a process pool.
+MIN_PARALLEL_BATCH = 1024
+
+# DSeparation engine of a worker process of a batch query.
+_worker_engine = None
+
+
+def _init_worker(engine):
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _test_chunk(args):
+    queries, cut = args
+    return [_worker_engine._test(x, y, z, cut) for x, y, z in queries]
+
+
+def adjacency_lists(indptr, indices):
+    """Return the CSR arrays as a list of neighbour lists."""
+    indices, bounds = indices.tolist(), indptr.tolist()
+    return [indices[s:e] for s, e in zip(bounds[:-1], bounds[1:])]
+
+
+class DSeparation:
+    """
+    Linear-time d-separation tests (Bayes-ball, see Shachter (1998) and
+    Koller and Friedman (2009), Algorithm 3.1) on a causal graph with latent
+    confounding arcs.
+
+    Every latent confounding arc a <-> b is treated as an unobserved parent
+    shared by a and b without building it explicitly: the ball passes from
+    a to b whenever it could leave a towards one of its parents, and it
+    arrives at b as if it came from a parent. Each query visits every node
+    and edge at most twice, i.e., it takes O(V + E). Ancestors of the
+    conditioning sets are cached so that queries with the same conditioning
+    set share them.
+
+    Attributes
+    ----------
+    index : dict
+        Map from node names to integers.
+    parents : list of list of int
+    children : list of list of int
+    spouses : list of list of int
+        Nodes sharing a latent confounding arc with every node.
+
+    Methods
+    ----------
+    is_d_separated(x, y, z, cut_outgoing=None)
+        Check if z d-separates x and y.
+    is_d_separated_many(x, y, test_sets, cut_outgoing=None, n_jobs=None)
+        Check if each of test_sets d-separates x and y.
+    is_d_separated_batch(queries, cut_outgoing=None, n_jobs=None)
+        Check every (x, y, z) triple of queries.
+    d_connected(x, z, cut_outgoing=None)
+        Return all nodes d-connected to x given z.
+    """
+
+    def __init__(self, csr):
+        """
+        Parameters
+        ----------
+        csr : CsrGraph
+            The integer-indexed structure of the graph.
+        """
+        self.names = csr.names
+        self.index = csr.index
+        self.parents = adjacency_lists(*csr.parents)
+        self.children = adjacency_lists(*csr.children)
+        self.spouses = adjacency_lists(*csr.arcs)
+        self._ancestors = OrderedDict()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_ancestors'] = OrderedDict()
+        return state
+
+    def _indices(self, nodes):
+        try:
+            return [self.index[node] for node in nodes]
+        except KeyError:
+            raise nx.NodeNotFound(
+                'one or more specified nodes not found in the graph'
+            )
+
+    def _ancestor_flags(self, z, cut):
+        """Return flags of the ancestors of z in the graph without the
+        outgoing edges of cut.
+        """
+        key = (frozenset(z), frozenset(cut))
+        try:
+            self._ancestors.move_to_end(key)
+            return self._ancestors[key]
+        except KeyError:
+            pass
+
+        flags = bytearray(len(self.names))
+        stack = list(z)
+        for node in stack:
+            flags[node] = 1
+        while stack:
+            for parent in self.parents[stack.pop()]:
+                if not flags[parent] and parent not in cut:
+                    flags[parent] = 1
+                    stack.append(parent)
+
+        self._ancestors[key] = flags
+        if len(self._ancestors) > ANCESTOR_CACHE_SIZE:
+            self._ancestors.popitem(last=False)
+        return flags
+
+    def _reachable(self, x, z, cut, targets=None):
+        """Return flags of the nodes d-connected to x given z, where the
+        outgoing edges of cut are ignored. If targets is given, return None
+        as soon as one of the targets is reached.
+        """
+        n = len(self.names)
+        conditioned = bytearray(n)
+        for node in z:
+            conditioned[node] = 1
+        an_z = self._ancestor_flags(z, cut)
+        parents, children, spouses = self.parents, self.children, self.spouses
+
+        # the ball is either going up, i.e., it arrived at a node from one of
+        # its children, or going down, i.e., it arrived from a parent
+        visited_up, visited_down = bytearray(n), bytearray(n)
+        reached = bytearray(n)
+        up, down = list(x), []
+        while up or down:
+            if up:
+                node = up.pop()
+                if visited_up[node]:
+                    continue
+                visited_up[node] = 1
+                if conditioned[node]:
+                    continue
+                if targets is not None and node in targets:
+                    return None
+                reached[node] = 1
+                up.extend(p for p in parents[node] if p not in cut)
+                if node not in cut:
+                    down.extend(children[node])
+                down.extend(spouses[node])
+            else:
+                node = down.pop()
+                if visited_down[node]:
+                    continue
+                visited_down[node] = 1
+                if not conditioned[node]:
+                    if targets is not None and node in targets:
+                        return None
+                    reached[node] = 1
+                    if node not in cut:
+                        down.extend(children[node])
+                if an_z[node]:
+                    # the node is an open collider
+                    up.extend(p for p in parents[node] if p not in cut)
+                    down.extend(spouses[node])
+        return reached
+
+    def d_connected(self, x, z, cut_outgoing=None):
+        """Return all nodes d-connected to x given z.
+
+        Parameters
+        ----------
+        x : set of str
+        z : set of str
+        cut_outgoing : set of str, optional
+            Nodes whose outgoing edges are removed from the graph. Defaults
+            to None.
+
+        Returns
+        ----------
+        set of str
+            Nodes not in z connected to x by a path that is active given z,
+            including x itself if it is not in z.
+        """
+        cut = frozenset(self._indices(cut_outgoing or ()))
+        reached = self._reachable(
+            self._indices(x), self._indices(z), cut
+        )
+        return {self.names[i] for i, flag in enumerate(reached) if flag}
+
+    def is_d_separated(self, x, y, z, cut_outgoing=None):
+        """Check if z d-separates x and y.
+
+        Parameters
+        ----------
+        x : set of str
+        y : set of str
+        z : set of str
+        cut_outgoing : set of str, optional
+            Nodes whose outgoing edges are removed from the graph, e.g., the
+            treatments when testing the backdoor criterion. Defaults to None.
+
+        Returns
+        ----------
+        bool
+        """
+        cut = frozenset(self._indices(cut_outgoing or ()))
+        return self._test(
+            self._indices(x), self._indices(y), self._indices(z), cut
+        )
+
+    def is_d_separated_many(self, x, y, test_sets, cut_outgoing=None,
+                            n_jobs=None):
+        """Check if each set in test_sets d-separates x and y.
+
+        Parameters
+        ----------
+        x : set of str
+        y : set of str
+        test_sets : list of set of str
+        cut_outgoing : set of str, optional
+            See is_d_separated(). Defaults to None.
+        n_jobs : int, optional
+            Number of processes over which large batches are split. Defaults
+            to None, i.e., run in the current process.
+
+        Returns
+        ----------
+        list of bool
+        """
+        x, y = self._indices(x), self._indices(y)
+        queries = [(x, y, self._indices(z)) for z in test_sets]
+        return self._run(queries, cut_outgoing, n_jobs)
+
+    def is_d_separated_batch(self, queries, cut_outgoing=None, n_jobs=None):
+        """Check if z d-separates x and y for every (x, y, z) in queries.
+
+        Parameters
+        ----------
+        queries : list of tuple
+            Each element contains three sets of str (x, y, z).
+        cut_outgoing : set of str, optional
+            See is_d_separated(). Defaults to None.
+        n_jobs : int, optional
+            Number of processes over which large batches are split. Defaults
+            to None, i.e., run in the current process.
+
+        Returns
+        ----------
+        list of bool
+        """
+        queries = [
+            (self._indices(x), self._indices(y), self._indices(z))
+            for x, y, z in queries
+        ]
+        return self._run(queries, cut_outgoing, n_jobs)
+
+    def _run(self, queries, cut_outgoing, n_jobs):
+        cut = frozenset(self._indices(cut_outgoing or ()))
+        if n_jobs is None or n_jobs <= 1 or len(queries) < MIN_PARALLEL_BATCH:
+            return [self._test(x, y, z, cut) for x, y, z in queries]
+
+        size = -(-len(queries) // (4 * n_jobs))
+        chunks = [
+            (queries[i:i + size], cut) for i in range(0, len(queries), size)
+        ]
+        with ProcessPoolExecutor(
+            n_jobs, initializer=_init_worker, initargs=(self,)
+        ) as pool:
+            return [
+                result for chunk in pool.map(_test_chunk, chunks)
+                for result in chunk
+            ]
+
+    def _test(self, x, y, z, cut):
+        if not x or not y:
+            return True
+        if not set(x).isdisjoint(y):
+            return False
+        return self._reachable(x, z, cut, targets=set(y)) is not None